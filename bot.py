@@ -5,14 +5,28 @@ from discord import Activity, ActivityType
 import os
 import asyncio
 import sys
-from collections import defaultdict
-from datetime import datetime
+import typing
 import json
-import atexit 
+import time
+import math
+import hashlib
+from datetime import datetime, timedelta
+import atexit
+from warnings_store import open_warning_store, JournalWarningStore, PersistenceWriter, load_retention_rules
+from snipe_store import SnipeRecord, SnipeCache, SnipeFileStore
+from responders import load_responders, ResponseThrottle
+from outbound import (
+    OutboundScheduler, OutboundDropped, RouteLimits, channel_route, dm_route, MODERATION, REPLY, DM
+)
+from jobs import JobQueue, PermanentJobError
+from cache_profile import client_options, cache_report, compare_to_baseline, caches_members, rss_bytes
+from resolver import UserResolver, ChannelResolver
+from modlog import ModLog
+from metrics import MetricsRegistry
 
 # Import keep_alive with error handling
 try:
-    from keep_alive import keep_alive, pinger
+    from keep_alive import keep_alive, stop_keep_alive, pinger
     KEEP_ALIVE_AVAILABLE = True
     print("✅ Keep-alive module loaded")
 except ImportError as e:
@@ -20,80 +34,132 @@ except ImportError as e:
     print(f"⚠️  Keep-alive not available: {e}")
 
 # ===== PERSISTENT WARNINGS STORAGE =====
-WARNINGS_FILE = "warnings.json"
+WARNINGS_BACKEND = os.environ.get('WARNINGS_BACKEND', 'sqlite')
 
 def load_warnings():
-    """Load warnings from JSON file"""
-    if os.path.exists(WARNINGS_FILE):
-        try:
-            with open(WARNINGS_FILE, 'r') as f:
-                data = json.load(f)
-                
-            # Convert string keys back to integers and reconstruct warning objects
-            warnings = defaultdict(list)
-            for user_id_str, warnings_list in data.items():
-                user_id = int(user_id_str)
-                for warn in warnings_list:
-                    # Reconstruct warning object
-                    warning_data = {
-                        "reason": warn["reason"],
-                        "moderator_id": warn["moderator_id"],
-                        "timestamp": datetime.fromisoformat(warn["timestamp"]),
-                        "warning_id": warn["warning_id"]
-                    }
-                    warnings[user_id].append(warning_data)
-            return warnings
-        except Exception as e:
-            print(f"⚠️  Error loading warnings: {e}")
-            return defaultdict(list)
-    return defaultdict(list)
-
-def save_warnings():
-    """Save warnings to JSON file"""
+    """Open the configured warnings store"""
     try:
-        # Convert warnings to JSON-serializable format
-        data = {}
-        for user_id, warnings_list in warnings_storage.items():
-            user_warnings = []
-            for warn in warnings_list:
-                # Convert moderator object to ID, handle both cases
-                moderator_id = warn["moderator"].id if hasattr(warn["moderator"], 'id') else warn.get("moderator_id", 0)
-                
-                user_warnings.append({
-                    "reason": warn["reason"],
-                    "moderator_id": moderator_id,
-                    "timestamp": warn["timestamp"].isoformat(),
-                    "warning_id": warn["warning_id"]
-                })
-            data[str(user_id)] = user_warnings
-        
-        with open(WARNINGS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"✅ Saved warnings for {len(data)} users")
+        return open_warning_store(WARNINGS_BACKEND)
     except Exception as e:
-        print(f"❌ Error saving warnings: {e}")
+        print(f"⚠️  Error loading warnings ({WARNINGS_BACKEND}): {e}")
+        print("⚠️  Falling back to the journal warnings store")
+        return JournalWarningStore()
+
+async def get_members_from_ids(guild, member_ids):
+    """Map IDs to member objects: cached members first, then one concurrent fetch of the rest"""
+    members = {}
+    missing = []
+    for member_id in dict.fromkeys(member_ids):
+        member = guild.get_member(member_id)
+        if member:
+            members[member_id] = member
+        else:
+            missing.append(member_id)
+    for member_id, user in (await user_resolver.resolve_many(missing)).items():
+        # If Discord doesn't know the user either, use a placeholder
+        members[member_id] = user or type('Object', (), {'name': f'User({member_id})', 'id': member_id, 'mention': f'<@{member_id}>'})()
+    return members
 
-def get_member_from_id(guild, member_id):
-    """Try to get member object from ID"""
-    member = guild.get_member(member_id)
-    if member:
-        return member
-    # If member not found in cache, return a placeholder
-    return type('Object', (), {'name': f'User({member_id})', 'id': member_id, 'mention': f'<@{member_id}>'})()
+def members_cached(guild, member_ids):
+    """Whether every ID resolves without a REST call"""
+    return all(guild.get_member(member_id) or user_resolver.cached(member_id) for member_id in member_ids)
 
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
 intents.messages = True
 
-bot = commands.Bot(command_prefix=['.', '!'], intents=intents)
+# ===== OUTBOUND MESSAGES =====
+route_limits = RouteLimits()  # Fed by the rate-limit headers of every API response
+outbound = OutboundScheduler(route_limits)
+job_queue = JobQueue()  # Durable background side-effects such as warn DMs
+MODERATION_COMMANDS = {'warn', 'masswarn', 'warns', 'clearwarns', 'kick', 'ban', 'cs', 'sendmessage', 'modlog'}
+
+class ScheduledContext(commands.Context):
+    """Prefix-command context whose replies go through the outbound scheduler"""
+    
+    async def send(self, *args, **kwargs):
+        priority = MODERATION if self.command and self.command.name in MODERATION_COMMANDS else REPLY
+        return await outbound.send(
+            priority, channel_route(self.channel.id),
+            lambda: commands.Context.send(self, *args, **kwargs)
+        )
+
+# ===== METRICS =====
+metrics = MetricsRegistry()  # Served at /metrics by keep_alive
+gateway_events = metrics.counter('discord_gateway_events_total', 'Gateway events received, by type', label='type')
+command_runs = metrics.counter('bot_commands_total', 'Commands completed, by command', label='command')
+command_errors = metrics.counter('bot_command_errors_total', 'Commands that raised an error, by command', label='command')
+
+class InstrumentedTree(app_commands.CommandTree):
+    """Command tree that counts slash command errors"""
+    
+    async def on_error(self, interaction, error):
+        command_errors.inc(interaction.command.qualified_name if interaction.command else 'unknown')
+        await super().on_error(interaction, error)
+
+class InstrumentedBot(commands.Bot):
+    """Bot that counts gateway events and command outcomes as they are dispatched (a dict update each)"""
+    
+    def dispatch(self, event_name, /, *args, **kwargs):
+        if event_name == 'socket_event_type':
+            gateway_events.inc(args[0])
+        elif event_name == 'command_completion':
+            command_runs.inc(args[0].command.qualified_name)
+        elif event_name == 'app_command_completion':
+            command_runs.inc(args[1].qualified_name)
+        elif event_name == 'command_error':
+            command_errors.inc(args[0].command.qualified_name if args[0].command else 'unknown')
+        super().dispatch(event_name, *args, **kwargs)
+
+# CACHE_PROFILE=lean skips member caching and chunking and keeps a smaller message cache
+bot = InstrumentedBot(
+    command_prefix=['.', '!'], tree_cls=InstrumentedTree,
+    http_trace=route_limits.trace_config(), **client_options(intents)
+)
+user_resolver = UserResolver(bot)  # Users missing from the gateway cache, fetched on demand
+channel_resolver = ChannelResolver(bot)  # Channels by id for any command, with missing ids remembered briefly
 
 # ===== SNIPE STORAGE =====
-snipe_storage = defaultdict(list)
 MAX_SNIPES = 5
+# channel_id -> ring of SnipeRecord, under a global byte budget, written through to disk
+snipe_storage = SnipeCache(MAX_SNIPES, store=SnipeFileStore())
+SNIPE_SWEEP_INTERVAL = 600  # 10 minutes
 
 # ===== WARNINGS STORAGE =====
-warnings_storage = load_warnings()  # Load from file on startup
+warnings_store = load_warnings()  # Open the store on startup
+warnings_writer = PersistenceWriter(warnings_store)  # Writes happen off the event loop
+mod_log = ModLog()  # Append-only audit log of every moderation action
+
+def bot_health():
+    """Ready once the gateway is connected with a measured heartbeat; returns (ready, details)"""
+    latency = bot.latency
+    ready = bot.is_ready() and not bot.is_closed() and bot.ws is not None and bot.ws.open and math.isfinite(latency)
+    return ready, {
+        "status": "healthy" if ready else "unavailable",
+        "gateway_latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+        "guilds": len(bot.guilds),
+    }
+
+# Gauges are read at scrape time, so they cost nothing between scrapes
+metrics.gauge('discord_up', 'Whether the gateway is connected and ready', lambda: int(bot_health()[0]))
+metrics.gauge('discord_gateway_latency_seconds', 'Heartbeat round trip', lambda: bot.latency)
+metrics.gauge('discord_guilds', 'Guilds the bot is in', lambda: len(bot.guilds))
+metrics.gauge('snipe_channels', 'Channels with sniped messages', lambda: snipe_storage.stats()['channels'])
+metrics.gauge('snipe_records', 'Sniped messages held', lambda: snipe_storage.stats()['records'])
+metrics.gauge('snipe_bytes', 'Approximate bytes held by sniped messages', lambda: snipe_storage.nbytes)
+metrics.gauge('warnings_stored', 'Warnings in the store', lambda: warnings_store.stats()[0])
+metrics.gauge('warnings_users', 'Users with at least one warning', lambda: warnings_store.stats()[1])
+metrics.summary(
+    'warnings_write_duration_seconds', 'Time spent persisting warnings per write',
+    lambda: (warnings_writer.writes + warnings_writer.failed_writes, warnings_writer.write_seconds)
+)
+metrics.gauge(
+    'outbound_queued', 'Messages waiting in the outbound queue, by priority',
+    lambda: {name: stats['queued'] for name, stats in outbound.stats().items()}, label='priority'
+)
+metrics.gauge('jobs_pending', 'Background jobs not yet finished', lambda: job_queue.stats()['pending'])
+metrics.gauge('process_resident_memory_bytes', 'Resident set size', rss_bytes)
 
 @bot.event
 async def on_ready():
@@ -101,13 +167,22 @@ async def on_ready():
     print(f'✅ {bot.user} is online!')
     print(f'🆔 Bot ID: {bot.user.id}')
     print(f'📊 Servers: {len(bot.guilds)}')
+
+    # Warnings saved before they were keyed by guild can only belong to our one guild;
+    # done before the first await so no command sees the store half-imported
+    if warnings_store.legacy_pending:
+        if len(bot.guilds) == 1:
+            warnings_store.import_legacy(bot.guilds[0].id)
+        else:
+            print(f'⚠️  Legacy warnings not imported: bot is in {len(bot.guilds)} servers, set WARNINGS_LEGACY_GUILD_ID')
+
     await bot.change_presence(
         activity=Activity(
             type=ActivityType.watching,
             name="Void.lua"
         )
     )
-    if KEEP_ALIVE_AVAILABLE:
+    if KEEP_ALIVE_AVAILABLE and pinger.task is not None:  # The pinger only starts once the port is bound
         print('🌐 Keep-alive: ACTIVE (auto-pinging every 5 min)')
         try:
             url = pinger.get_own_url()
@@ -117,31 +192,163 @@ async def on_ready():
     else:
         print('⚠️  Keep-alive: INACTIVE')
     
-    print('🎯 Monitoring channel: 1442227479182835722')
+    print(f'🎯 Auto-responders: {len(responders.rules)} rule(s) in {len(responders.channel_ids)} channel(s)')
     
-    # Sync slash commands
-    try:
-        synced = await bot.tree.sync()
-        print(f'✅ Synced {len(synced)} slash command(s)')
-    except Exception as e:
-        print(f'⚠️  Error syncing commands: {e}')
+    # on_ready fires again after every gateway reconnect; only the first one does startup work
+    global startup_done
+    if startup_done:
+        print('🔄 Reconnected, skipping startup tasks')
+        print('=' * 50)
+        return
+    startup_done = True
+    
+    # Sync slash commands (only when the command tree changed)
+    await sync_commands()
     
     # Load warnings count
-    total_warnings = sum(len(warns) for warns in warnings_storage.values())
-    print(f'📝 Loaded {total_warnings} warnings for {len(warnings_storage)} users')
+    total_warnings, total_users = warnings_store.stats()
+    print(f'📝 Loaded {total_warnings} warnings for {total_users} users')
+    
+    report = cache_report(bot)
+    print(
+        f"🧠 Cache profile '{report['profile']}': {report['rss_mb']} MB RSS, "
+        f"{report['users']} users, {report['members']} members, "
+        f"{report['messages']}/{report['max_messages']} messages cached"
+    )
+    baseline = compare_to_baseline(report)
+    if baseline:
+        print(
+            f"🧠 vs default profile (last run: {baseline['guilds']} servers, {baseline['members']} members): "
+            f"{report['rss_mb'] - baseline['rss_mb']:+.1f} MB RSS, "
+            f"{report['members'] - baseline['members']:+d} cached members"
+        )
+    elif report['profile'] != 'default':
+        print("🧠 No default-profile baseline yet; run once with CACHE_PROFILE=default to compare")
+    if not caches_members():
+        print("⚠️  Member cache off: masswarn role targets are unavailable")
     
     # Save warnings every 5 minutes
     bot.loop.create_task(periodic_save())
+    bot.loop.create_task(retention_sweep())
+    bot.loop.create_task(snipe_sweep())
+    job_queue.start()
     
     print('=' * 50)
 
+# ===== SLASH COMMAND SYNC =====
+startup_done = False
+COMMAND_HASH_FILE = os.environ.get('COMMAND_HASH_FILE', 'command_tree.json')
+FORCE_SYNC = os.environ.get('FORCE_SYNC', '').lower() in ('1', 'true', 'yes')
+DEV_GUILD_ID = int(os.environ.get('DEV_GUILD_ID', 0))  # Sync to one guild instantly while developing
+
+def command_tree_fingerprint():
+    """Stable hash of every app command's name, description, options and choices"""
+    payload = sorted(
+        (command.to_dict() for command in bot.tree.get_commands()),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def load_command_hashes():
+    try:
+        with open(COMMAND_HASH_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️  Error loading {COMMAND_HASH_FILE}: {e}")
+        return {}
+
+def save_command_hashes(hashes):
+    tmp_path = COMMAND_HASH_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(hashes, f, indent=2)
+    os.replace(tmp_path, COMMAND_HASH_FILE)
+
+async def sync_commands():
+    """Sync the command tree only if its fingerprint changed since the last sync"""
+    guild = discord.Object(id=DEV_GUILD_ID) if DEV_GUILD_ID else None
+    scope = f"{bot.application_id}:" + (f"guild:{DEV_GUILD_ID}" if guild else "global")
+    fingerprint = command_tree_fingerprint()
+    hashes = load_command_hashes()
+    
+    if not FORCE_SYNC and hashes.get(scope) == fingerprint:
+        print('✅ Slash commands unchanged, skipping sync')
+        return
+    
+    try:
+        if guild:
+            bot.tree.copy_global_to(guild=guild)
+        synced = await bot.tree.sync(guild=guild)
+        print(f'✅ Synced {len(synced)} slash command(s)' + (f' to guild {DEV_GUILD_ID}' if guild else ''))
+    except Exception as e:
+        print(f'⚠️  Error syncing commands: {e}')
+        return
+    
+    hashes[scope] = fingerprint
+    try:
+        save_command_hashes(hashes)
+    except Exception as e:
+        print(f"⚠️  Error saving {COMMAND_HASH_FILE}: {e}")
+
 async def periodic_save():
-    """Save warnings to file every 5 minutes"""
+    """Checkpoint the warnings store every 5 minutes"""
     await bot.wait_until_ready()
     while not bot.is_closed():
         await asyncio.sleep(300)  # 5 minutes
-        save_warnings()
-        print("💾 Auto-saved warnings to file")
+        if not warnings_store.changes_since_checkpoint:
+            continue  # Nothing changed since the last save
+        warnings_writer.request_checkpoint()
+        print("💾 Auto-saving warnings")
+
+# ===== WARNING RETENTION =====
+RETENTION_INTERVAL = 3600  # Seconds between sweeps
+RETENTION_BATCH = 100  # Users (or rows) handled before yielding to the event loop
+
+async def retention_sweep():
+    """Expire warnings under the per-guild retention rules, one small batch at a time"""
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        try:
+            default_rule, guild_rules = load_retention_rules()
+        except Exception as e:
+            print(f"⚠️  Error loading retention rules: {e}")
+            default_rule, guild_rules = {}, {}
+        
+        expired = 0
+        with warnings_store.lock:
+            guild_ids = set(warnings_store.counters.guilds) | set(guild_rules)
+        for guild_id in guild_ids:
+            rule = {**default_rule, **guild_rules.get(guild_id, {})}
+            max_age_days = rule.get("max_age_days")
+            max_per_user = rule.get("max_per_user")
+            if max_age_days is None and max_per_user is None:
+                continue
+            cutoff = datetime.utcnow() - timedelta(days=max_age_days) if max_age_days is not None else None
+            
+            cursor = None
+            while True:
+                # Off the event loop: a batch may load a guild's shard from disk
+                removed, cursor = await asyncio.to_thread(
+                    warnings_store.prune_warnings, guild_id, cutoff, max_per_user, cursor, RETENTION_BATCH
+                )
+                expired += removed
+                if cursor is None:
+                    break
+        
+        if expired:
+            print(f"🧹 Expired {expired} warning(s) under retention rules")
+        await asyncio.sleep(RETENTION_INTERVAL)
+
+async def snipe_sweep():
+    """Drop sniped messages past their TTL so idle channels free their memory"""
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        await asyncio.sleep(SNIPE_SWEEP_INTERVAL)
+        expired = snipe_storage.sweep()
+        if expired:
+            print(f"🧹 Expired {expired} sniped message(s)")
 
 
 # script commands
@@ -182,69 +389,96 @@ async def on_message_delete(message):
     if message.author.bot or not message.content:
         return
     
-    # Store message data
-    snipe_data = {
-        'content': message.content,
-        'author': message.author,
-        'timestamp': datetime.utcnow(),
-        'attachments': [att.url for att in message.attachments]
-    }
-    
-    # Add to storage and maintain max limit
-    snipe_storage[message.channel.id].append(snipe_data)
-    if len(snipe_storage[message.channel.id]) > MAX_SNIPES:
-        snipe_storage[message.channel.id].pop(0)
+    # Keep only plain fields so the cache never pins Member objects
+    snipe_storage.push(message.channel.id, SnipeRecord.from_message(message))
+
+# ===== CHANNEL EVENT LISTENERS =====
+# Keep the channel resolver from serving a channel (or its absence) that has since changed
+@bot.listen('on_guild_channel_create')
+async def invalidate_created_channel(channel):
+    channel_resolver.invalidate(channel.id)
+
+@bot.listen('on_guild_channel_delete')
+async def invalidate_deleted_channel(channel):
+    channel_resolver.invalidate(channel.id)
+
+@bot.listen('on_guild_channel_update')
+async def invalidate_updated_channel(before, after):
+    channel_resolver.invalidate(after.id)
+
+# ===== AUTO-RESPONDERS =====
+responders = load_responders()  # Rules from responders.json, compiled per channel
+responder_throttle = ResponseThrottle()  # Per-user/per-channel cooldowns, coalescing replies
+
+def create_responder_embed(rule, users):
+    """Create the embed an auto-responder rule replies with"""
+    embed = discord.Embed(
+        title=rule.title,
+        description=rule.description,
+        color=getattr(discord.Color, rule.color, discord.Color.blue)()
+    )
+    names = ", ".join(name for _, name, _ in users)
+    embed.set_footer(text=f"Triggered by {names}"[:2048], icon_url=users[0][2])
+    return embed
+
+async def send_responder_reply(channel, rule, users):
+    """Reply once to everyone who triggered a rule"""
+    mentions = " ".join(f"<@{user_id}>" for user_id, _, _ in users)
+    try:
+        await outbound.send(
+            REPLY, channel_route(channel.id),
+            lambda: channel.send(mentions, embed=create_responder_embed(rule, users))
+        )
+    except OutboundDropped:
+        print(f"⚠️  Outbound queue full, dropped {rule.name} reply")
+        return
+    print(f'{rule.emoji} Responded to {rule.name} request from {", ".join(name for _, name, _ in users)}')
+
+async def flush_responder_replies(channel, rule, delay):
+    """Send a coalesced reply once the channel's cooldown allows it"""
+    await asyncio.sleep(delay)
+    users = responder_throttle.flush(channel.id, rule.name)
+    if users:
+        try:
+            await send_responder_reply(channel, rule, users)
+        except Exception as e:
+            print(f"⚠️  Error sending coalesced {rule.name} reply: {e}")
+
+async def handle_responder(message, rule):
+    """Reply now, join a pending coalesced reply, or drop the match if the user is on cooldown"""
+    author = message.author
+    avatar_url = author.avatar.url if author.avatar else None
+    delay = responder_throttle.submit(message.channel.id, rule.name, author.id, author.display_name, avatar_url)
+    if delay is None:
+        return
+    if delay:
+        bot.loop.create_task(flush_responder_replies(message.channel, rule, delay))
+        return
+    await send_responder_reply(message.channel, rule, [(author.id, author.display_name, avatar_url)])
 
 @bot.event
 async def on_message(message):
     if message.author.bot:
         return
     
-    TARGET_CHANNEL_ID = 1442227479182835722
+    rule = responders.match(message.channel.id, message.content)
+    if rule:
+        await handle_responder(message, rule)
     
-    if message.channel.id == TARGET_CHANNEL_ID:
-        content_lower = message.content.lower()
-        
-        if 'script' in content_lower:
-            embed = discord.Embed(
-                title="📜 Script Location",
-                description=(
-                    f"You can find the script in <#1451252305063182397>!\n\n"
-                    f"By clicking the View Script button u will receive ur script\n\n"
-                    f"**📝 Note:** Make sure to read <#1365681644568317962> and <#1267755927914680371> before using!"
-                ),
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text=f"Triggered by {message.author.display_name}", 
-                           icon_url=message.author.avatar.url if message.author.avatar else None)
-            await message.channel.send(f"{message.author.mention}", embed=embed)
-            print(f'📨 Responded to script request from {message.author.name}')
-        
-        elif 'key' in content_lower:
-            embed = discord.Embed(
-                title="🔑 Key Location",
-                description=f"You can find the key in <#1451252305063182397>!\n\n"
-                            f"By clicking the Grab Key button u will receive ur key",
-                color=discord.Color.green()
-            )
-            embed.set_footer(text=f"Triggered by {message.author.display_name}", 
-                           icon_url=message.author.avatar.url if message.author.avatar else None)
-            await message.channel.send(f"{message.author.mention}", embed=embed)
-            print(f'🔑 Responded to key request from {message.author.name}')
-    
-    await bot.process_commands(message)
+    ctx = await bot.get_context(message, cls=ScheduledContext)
+    await bot.invoke(ctx)
 
 # ===== SNIPE HELPER FUNCTION =====
 def create_snipe_embed(snipe_data, index=None):
     """Create an embed for a sniped message"""
     embed = discord.Embed(
-        description=snipe_data['content'],
+        description=snipe_data.content,
         color=discord.Color.red(),
-        timestamp=snipe_data['timestamp']
+        timestamp=snipe_data.timestamp
     )
     embed.set_author(
-        name=str(snipe_data['author']),
-        icon_url=snipe_data['author'].display_avatar.url
+        name=snipe_data.author_name,
+        icon_url=snipe_data.avatar_url
     )
     
     if index is not None:
@@ -253,10 +487,10 @@ def create_snipe_embed(snipe_data, index=None):
         embed.set_footer(text="Most recent deleted message")
     
     # Add attachment URLs if any
-    if snipe_data['attachments']:
+    if snipe_data.attachments:
         embed.add_field(
             name="Attachments",
-            value='\n'.join(snipe_data['attachments']),
+            value='\n'.join(snipe_data.attachments),
             inline=False
         )
     
@@ -267,12 +501,12 @@ def create_snipe_embed(snipe_data, index=None):
 async def snipe_slash(interaction: discord.Interaction):
     channel_id = interaction.channel_id
     
-    if not snipe_storage[channel_id]:
+    snipes = snipe_storage.get(channel_id)
+    if not snipes:
         await interaction.response.send_message("No deleted messages to snipe!", ephemeral=True)
         return
     
-    snipe_data = snipe_storage[channel_id][-1]
-    embed = create_snipe_embed(snipe_data)
+    embed = snipe_storage.embed(channel_id, 1, None, create_snipe_embed)
     await interaction.response.send_message(embed=embed)
 
 @bot.command(name='s')
@@ -280,12 +514,12 @@ async def snipe_prefix(ctx):
     """View the most recently deleted message"""
     channel_id = ctx.channel.id
     
-    if not snipe_storage[channel_id]:
+    snipes = snipe_storage.get(channel_id)
+    if not snipes:
         await ctx.send("No deleted messages to snipe!")
         return
     
-    snipe_data = snipe_storage[channel_id][-1]
-    embed = create_snipe_embed(snipe_data)
+    embed = snipe_storage.embed(channel_id, 1, None, create_snipe_embed)
     await ctx.send(embed=embed)
 
 # ===== CLEAR SNIPE COMMANDS WITH CLEAN EMBEDS =====
@@ -303,7 +537,8 @@ async def clear_snipes_slash(interaction: discord.Interaction):
     
     channel_id = interaction.channel_id
     
-    if not snipe_storage[channel_id]:
+    count = snipe_storage.clear(channel_id)
+    if not count:
         embed = discord.Embed(
             title="📭 No Snipes",
             description="No sniped messages to clear in this channel!",
@@ -312,9 +547,6 @@ async def clear_snipes_slash(interaction: discord.Interaction):
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
-    count = len(snipe_storage[channel_id])
-    snipe_storage[channel_id].clear()
-    
     # Success embed - clean and simple
     embed = discord.Embed(
         title="✅ Snipes Cleared",
@@ -330,7 +562,8 @@ async def clear_snipes_prefix(ctx):
     """Clear all sniped messages in this channel"""
     channel_id = ctx.channel.id
     
-    if not snipe_storage[channel_id]:
+    count = snipe_storage.clear(channel_id)
+    if not count:
         embed = discord.Embed(
             title="📭 No Snipes",
             description="No sniped messages to clear in this channel!",
@@ -339,9 +572,6 @@ async def clear_snipes_prefix(ctx):
         await ctx.send(embed=embed)
         return
     
-    count = len(snipe_storage[channel_id])
-    snipe_storage[channel_id].clear()
-    
     # Success embed - clean and simple
     embed = discord.Embed(
         title="✅ Snipes Cleared",
@@ -351,23 +581,116 @@ async def clear_snipes_prefix(ctx):
     embed.set_footer(text=f"Cleared by {ctx.author.name}")
     await ctx.send(embed=embed)
 
+# ===== SNIPE CACHE STATS =====
+def create_snipe_stats_embed():
+    """Create an embed describing snipe cache usage"""
+    stats = snipe_storage.stats()
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+    embed = discord.Embed(title="📊 Snipe Cache", color=discord.Color.blue())
+    embed.add_field(name="Channels", value=str(stats['channels']), inline=True)
+    embed.add_field(name="Messages", value=str(stats['records']), inline=True)
+    embed.add_field(
+        name="Memory",
+        value=f"{stats['bytes'] / 1024:.1f} / {stats['max_bytes'] / 1024:.0f} KiB",
+        inline=True
+    )
+    embed.add_field(name="Hits / Misses", value=f"{stats['hits']} / {stats['misses']} ({hit_rate})", inline=True)
+    embed.add_field(name="Evictions", value=str(stats['evictions']), inline=True)
+    embed.add_field(name="Expired", value=str(stats['expirations']), inline=True)
+    embed.add_field(name="Embed Hits / Misses", value=f"{stats['embed_hits']} / {stats['embed_misses']}", inline=True)
+    return embed
+
+@bot.tree.command(name="snipestats", description="Show snipe cache usage (Admin only)")
+async def snipe_stats_slash(interaction: discord.Interaction):
+    # Check if user has Administrator permission
+    if not interaction.user.guild_permissions.administrator:
+        embed = discord.Embed(
+            title="❌ Permission Denied",
+            description="You need **Administrator** permission to view snipe stats!",
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+
+    await interaction.response.send_message(embed=create_snipe_stats_embed(), ephemeral=True)
+
+@bot.command(name='snipestats')
+@commands.has_permissions(administrator=True)
+async def snipe_stats_prefix(ctx):
+    """Show snipe cache usage"""
+    await ctx.send(embed=create_snipe_stats_embed())
+
+# ===== OUTBOUND QUEUE STATS =====
+def create_queue_stats_embed():
+    """Create an embed describing the outbound message queues"""
+    embed = discord.Embed(title="📬 Outbound Queues", color=discord.Color.blue())
+    for name, stats in outbound.stats().items():
+        embed.add_field(
+            name=name.title(),
+            value=(
+                f"Queued: **{stats['queued']}**\n"
+                f"Sent: {stats['sent']} • Failed: {stats['failed']} • Dropped: {stats['dropped']} • "
+                f"Rate-limited: {stats['parked']}\n"
+                f"Latency: {stats['avg_latency_ms']} ms avg, {stats['max_latency_ms']} ms max"
+            ),
+            inline=False
+        )
+    jobs = job_queue.stats()
+    embed.add_field(
+        name="Background Jobs",
+        value=(
+            f"Pending: **{jobs['pending']}**\n"
+            f"Succeeded: {jobs['succeeded']} • Retried: {jobs['retried']} • Failed: {jobs['failed']}"
+        ),
+        inline=False
+    )
+    for name, resolver in (("User Resolver", user_resolver), ("Channel Resolver", channel_resolver)):
+        stats = resolver.stats()
+        embed.add_field(
+            name=name,
+            value=(
+                f"Cached: **{stats['cached']}**\n"
+                f"Hits: {stats['hits']} • Negative hits: {stats['negative_hits']} • Fetches: {stats['misses']}"
+            ),
+            inline=False
+        )
+    return embed
+
+@bot.tree.command(name="queuestats", description="Show outbound message queue metrics (Admin only)")
+async def queue_stats_slash(interaction: discord.Interaction):
+    # Check if user has Administrator permission
+    if not interaction.user.guild_permissions.administrator:
+        embed = discord.Embed(
+            title="❌ Permission Denied",
+            description="You need **Administrator** permission to view queue stats!",
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+
+    await interaction.response.send_message(embed=create_queue_stats_embed(), ephemeral=True)
+
+@bot.command(name='queuestats')
+@commands.has_permissions(administrator=True)
+async def queue_stats_prefix(ctx):
+    """Show outbound message queue metrics"""
+    await ctx.send(embed=create_queue_stats_embed())
+
 # ===== INDIVIDUAL SNIPE VIEWERS =====
 async def view_snipe_number(channel_id, number, send_func):
     """Helper function to view a specific snipe number"""
-    if not snipe_storage[channel_id]:
+    snipes = snipe_storage.get(channel_id)
+    if not snipes:
         await send_func("No deleted messages to snipe!")
         return
     
-    snipes = snipe_storage[channel_id]
-    
     if number > len(snipes):
         await send_func(f"Only {len(snipes)} snipe(s) available!")
         return
     
     # Get the nth most recent message (1 = most recent)
-    index = -number
-    snipe_data = snipes[index]
-    embed = create_snipe_embed(snipe_data, number)
+    embed = snipe_storage.embed(channel_id, number, number, create_snipe_embed)
     await send_func(embed=embed)
 
 # Prefix commands for s1-s5 (anyone can use)
@@ -449,6 +772,45 @@ async def s5_slash(interaction: discord.Interaction):
 
 # ===== MODERATION COMMANDS (ADMINISTRATOR ONLY) =====
 # ===== WARN COMMAND =====
+def create_warn_dm_embed(guild_name, moderator_name, reason, total_warnings):
+    """Create the embed DM'd to a warned user"""
+    dm_embed = discord.Embed(
+        title="⚠️ You have been warned",
+        description=f"You received a warning in **{guild_name}**",
+        color=discord.Color.orange()
+    )
+    dm_embed.add_field(name="Reason", value=reason, inline=False)
+    dm_embed.add_field(name="Moderator", value=moderator_name, inline=True)
+    dm_embed.add_field(name="Total Warnings", value=str(total_warnings), inline=True)
+    dm_embed.set_footer(text="Please follow the server rules")
+    return dm_embed
+
+def queue_warn_dm(guild, moderator, user_id, reason, total_warnings):
+    """Hand a warn DM to the background job queue"""
+    job_queue.enqueue('warn_dm', {
+        'user_id': user_id,
+        'guild_name': guild.name,
+        'moderator_name': moderator.name,
+        'reason': reason,
+        'total_warnings': total_warnings
+    })
+
+async def send_warn_dm(payload):
+    """Job handler: DM a warned user"""
+    user = bot.get_user(payload['user_id'])
+    try:
+        if user is None:
+            user = await bot.fetch_user(payload['user_id'])
+        dm_embed = create_warn_dm_embed(
+            payload['guild_name'], payload['moderator_name'], payload['reason'], payload['total_warnings']
+        )
+        dm_channel = user.dm_channel or await user.create_dm()
+        await outbound.send(DM, dm_route(dm_channel.id), lambda: dm_channel.send(embed=dm_embed))
+    except (discord.Forbidden, discord.NotFound) as e:
+        raise PermanentJobError(str(e))  # DMs disabled or the user is gone
+
+job_queue.register('warn_dm', send_warn_dm)
+
 @bot.tree.command(name="warn", description="Warn a user with a reason")
 @app_commands.describe(
     user="The user to warn",
@@ -486,14 +848,9 @@ async def warn_slash(interaction: discord.Interaction, user: discord.Member, rea
         return
     
     # Add warning to storage
-    warning_data = {
-        "reason": reason,
-        "moderator": interaction.user,
-        "timestamp": datetime.utcnow(),
-        "warning_id": len(warnings_storage[user.id]) + 1
-    }
-    warnings_storage[user.id].append(warning_data)
-    save_warnings()  # Save immediately
+    warning_data = warnings_store.add_warning(interaction.guild.id, user.id, reason, interaction.user.id)
+    mod_log.record(interaction.guild.id, 'warn', interaction.user.id, user.id, reason)
+    total_warnings = warnings_store.count_warnings(interaction.guild.id, user.id)
     
     # Send success embed
     embed = discord.Embed(
@@ -502,27 +859,15 @@ async def warn_slash(interaction: discord.Interaction, user: discord.Member, rea
         color=discord.Color.orange()
     )
     embed.add_field(name="Reason", value=reason, inline=False)
-    embed.add_field(name="Warnings", value=f"Total: **{len(warnings_storage[user.id])}**", inline=True)
+    embed.add_field(name="Warnings", value=f"Total: **{total_warnings}**", inline=True)
     embed.add_field(name="Moderator", value=interaction.user.mention, inline=True)
     embed.set_footer(text=f"User ID: {user.id} • Warning #{warning_data['warning_id']}")
     embed.timestamp = datetime.utcnow()
     
     await interaction.response.send_message(embed=embed)
     
-    # Try to DM the user (optional)
-    try:
-        dm_embed = discord.Embed(
-            title="⚠️ You have been warned",
-            description=f"You received a warning in **{interaction.guild.name}**",
-            color=discord.Color.orange()
-        )
-        dm_embed.add_field(name="Reason", value=reason, inline=False)
-        dm_embed.add_field(name="Moderator", value=interaction.user.name, inline=True)
-        dm_embed.add_field(name="Total Warnings", value=str(len(warnings_storage[user.id])), inline=True)
-        dm_embed.set_footer(text="Please follow the server rules")
-        await user.send(embed=dm_embed)
-    except:
-        pass  # User has DMs disabled
+    # DM the user in the background (retried, dropped if their DMs are closed)
+    queue_warn_dm(interaction.guild, interaction.user, user.id, reason, total_warnings)
 
 @bot.command(name='warn')
 @commands.has_permissions(administrator=True)
@@ -549,14 +894,9 @@ async def warn_prefix(ctx, user: discord.Member, *, reason="No reason provided")
         return
     
     # Add warning to storage
-    warning_data = {
-        "reason": reason,
-        "moderator": ctx.author,
-        "timestamp": datetime.utcnow(),
-        "warning_id": len(warnings_storage[user.id]) + 1
-    }
-    warnings_storage[user.id].append(warning_data)
-    save_warnings()  # Save immediately
+    warning_data = warnings_store.add_warning(ctx.guild.id, user.id, reason, ctx.author.id)
+    mod_log.record(ctx.guild.id, 'warn', ctx.author.id, user.id, reason)
+    total_warnings = warnings_store.count_warnings(ctx.guild.id, user.id)
     
     # Send success embed
     embed = discord.Embed(
@@ -565,27 +905,179 @@ async def warn_prefix(ctx, user: discord.Member, *, reason="No reason provided")
         color=discord.Color.orange()
     )
     embed.add_field(name="Reason", value=reason, inline=False)
-    embed.add_field(name="Warnings", value=f"Total: **{len(warnings_storage[user.id])}**", inline=True)
+    embed.add_field(name="Warnings", value=f"Total: **{total_warnings}**", inline=True)
     embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
     embed.set_footer(text=f"User ID: {user.id} • Warning #{warning_data['warning_id']}")
     embed.timestamp = datetime.utcnow()
     
     await ctx.send(embed=embed)
     
-    # Try to DM the user (optional)
-    try:
-        dm_embed = discord.Embed(
-            title="⚠️ You have been warned",
-            description=f"You received a warning in **{ctx.guild.name}**",
-            color=discord.Color.orange()
+    # DM the user in the background (retried, dropped if their DMs are closed)
+    queue_warn_dm(ctx.guild, ctx.author, user.id, reason, total_warnings)
+
+# ===== MASS WARN COMMAND =====
+MAX_BULK_WARN = 50  # Users per mass warn
+MEMBER_FETCH_CONCURRENCY = 5  # Uncached members fetched at once
+
+def bulk_warn(guild, moderator, targets, reason):
+    """Warn many members with one store batch and queue their DMs"""
+    members = []
+    skipped = 0
+    seen = set()
+    for member in targets:
+        if member.id in seen:
+            continue
+        seen.add(member.id)
+        if member.bot or member.id == moderator.id or len(members) >= MAX_BULK_WARN:
+            skipped += 1
+            continue
+        members.append(member)
+    
+    warnings_store.add_warnings(guild.id, [m.id for m in members], reason, moderator.id)
+    mod_log.record(guild.id, 'warn', moderator.id, [m.id for m in members], reason)
+    totals = {m.id: warnings_store.count_warnings(guild.id, m.id) for m in members}
+    
+    for member in members:
+        queue_warn_dm(guild, moderator, member.id, reason, totals[member.id])
+    return members, totals, skipped
+
+def create_bulk_warn_embed(members, totals, skipped, reason, moderator, not_found=0):
+    """Create the summary embed for a mass warn"""
+    lines = [f"{m.mention} (total: **{totals[m.id]}**)" for m in members]
+    listing = "\n".join(lines)
+    if len(listing) > 1024:
+        listing = listing[:1000].rsplit("\n", 1)[0] + "\n…"
+    embed = discord.Embed(
+        title="⚠️ Users Warned",
+        description=f"Warned **{len(members)}** user(s).",
+        color=discord.Color.orange()
+    )
+    embed.add_field(name="Reason", value=reason, inline=False)
+    embed.add_field(name="Users", value=listing or "None", inline=False)
+    embed.add_field(name="Moderator", value=moderator.mention, inline=True)
+    embed.add_field(name="DMs Queued", value=str(len(members)), inline=True)
+    if skipped:
+        embed.add_field(name="Skipped", value=f"{skipped} (bots, yourself or over the {MAX_BULK_WARN} limit)", inline=True)
+    if not_found:
+        embed.add_field(name="Not Found", value=f"{not_found} ID(s) aren't members of this server", inline=True)
+    embed.timestamp = datetime.utcnow()
+    return embed
+
+def role_members(guild, role):
+    """Everyone with a role, or None when the member cache can't list them all.
+
+    role.members only sees cached members, which is the whole guild only once it
+    has been chunked (Server Members intent and a profile that caches members).
+    """
+    if not guild.chunked:
+        return None
+    return list(role.members)
+
+def create_role_unavailable_embed(role):
+    reason = (
+        "the bot runs with its member cache off (`CACHE_PROFILE=lean`)" if not caches_members()
+        else "this server's member list isn't cached (the bot needs the Server Members intent)"
+    )
+    return discord.Embed(
+        title="❌ Role Targets Unavailable",
+        description=f"I can't see everyone with {role.mention}: {reason}. Mention the users to warn instead.",
+        color=discord.Color.red()
+    )
+
+def create_no_users_embed():
+    return discord.Embed(
+        title="❌ No Users",
+        description="Give some users or a role to warn!",
+        color=discord.Color.red()
+    )
+
+def parse_member_ids(text):
+    """Pull user ids out of a string of mentions and/or raw ids, without duplicates"""
+    ids = {}
+    for token in text.replace(',', ' ').split():
+        token = token.strip('<@!>')
+        if token.isdigit():
+            ids[int(token)] = None
+    return list(ids)
+
+async def fetch_members(guild, member_ids):
+    """Resolve ids to members, fetching uncached ones a few at a time; returns (members, not found count)"""
+    semaphore = asyncio.Semaphore(MEMBER_FETCH_CONCURRENCY)
+    
+    async def resolve(member_id):
+        member = guild.get_member(member_id)
+        if member is not None:
+            return member
+        async with semaphore:
+            try:
+                return await guild.fetch_member(member_id)
+            except discord.HTTPException:
+                return None
+    
+    results = await asyncio.gather(*(resolve(member_id) for member_id in member_ids))
+    members = [member for member in results if member is not None]
+    return members, len(results) - len(members)
+
+@bot.tree.command(name="masswarn", description="Warn several users (or everyone with a role) at once")
+@app_commands.describe(
+    users="Mentions or IDs of the users to warn, separated by spaces",
+    role="Warn every member with this role",
+    reason="Reason for the warning"
+)
+async def masswarn_slash(interaction: discord.Interaction, reason: str = "No reason provided",
+                         users: str = "", role: discord.Role = None):
+    # Check if user has Administrator permission
+    if not interaction.user.guild_permissions.administrator:
+        embed = discord.Embed(
+            title="❌ Permission Denied",
+            description="You need **Administrator** permission to warn users!",
+            color=discord.Color.red()
         )
-        dm_embed.add_field(name="Reason", value=reason, inline=False)
-        dm_embed.add_field(name="Moderator", value=ctx.author.name, inline=True)
-        dm_embed.add_field(name="Total Warnings", value=str(len(warnings_storage[user.id])), inline=True)
-        dm_embed.set_footer(text="Please follow the server rules")
-        await user.send(embed=dm_embed)
-    except:
-        pass
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
+    member_ids = parse_member_ids(users)
+    targets = role_members(interaction.guild, role) if role else []
+    # Rejected before deferring so these replies can stay ephemeral
+    if targets is None:
+        await interaction.response.send_message(embed=create_role_unavailable_embed(role), ephemeral=True)
+        return
+    if not targets and not member_ids:
+        await interaction.response.send_message(embed=create_no_users_embed(), ephemeral=True)
+        return
+    
+    await interaction.response.defer()
+    
+    # Only fetch as many ids as can still be warned
+    role_ids = {member.id for member in targets}
+    member_ids = [member_id for member_id in member_ids if member_id not in role_ids]
+    room = max(0, MAX_BULK_WARN - len(targets))
+    over_limit = max(0, len(member_ids) - room)
+    fetched, not_found = await fetch_members(interaction.guild, member_ids[:room])
+    targets.extend(fetched)
+    
+    members, totals, skipped = bulk_warn(interaction.guild, interaction.user, targets, reason)
+    skipped += over_limit
+    embed = create_bulk_warn_embed(members, totals, skipped, reason, interaction.user, not_found)
+    await interaction.followup.send(embed=embed)
+
+@bot.command(name='masswarn')
+@commands.has_permissions(administrator=True)
+async def masswarn_prefix(ctx, members: commands.Greedy[discord.Member], role: typing.Optional[discord.Role] = None,
+                          *, reason="No reason provided"):
+    """Warn several users (or everyone with a role) at once (Administrator only)"""
+    role_targets = role_members(ctx.guild, role) if role else []
+    if role_targets is None:
+        await ctx.send(embed=create_role_unavailable_embed(role))
+        return
+    targets = list(members) + role_targets
+    
+    if not targets:
+        await ctx.send(embed=create_no_users_embed())
+        return
+    
+    warned, totals, skipped = bulk_warn(ctx.guild, ctx.author, targets, reason)
+    await ctx.send(embed=create_bulk_warn_embed(warned, totals, skipped, reason, ctx.author))
 
 # ===== BAN COMMAND =====
 @bot.tree.command(name="ban", description="Ban a user from the server")
@@ -646,6 +1138,7 @@ async def ban_slash(interaction: discord.Interaction, user: discord.Member,
     # Ban the user
     try:
         await user.ban(reason=f"{reason} (Banned by {interaction.user})", delete_message_days=delete_days)
+        mod_log.record(interaction.guild.id, 'ban', interaction.user.id, user.id, reason)
         
         # Send success embed
         embed = discord.Embed(
@@ -713,6 +1206,7 @@ async def ban_prefix(ctx, user: discord.Member, delete_days: int = 0, *, reason=
     # Ban the user
     try:
         await user.ban(reason=f"{reason} (Banned by {ctx.author})", delete_message_days=delete_days)
+        mod_log.record(ctx.guild.id, 'ban', ctx.author.id, user.id, reason)
         
         # Send success embed
         embed = discord.Embed(
@@ -793,6 +1287,7 @@ async def kick_slash(interaction: discord.Interaction, user: discord.Member, rea
     # Kick the user
     try:
         await user.kick(reason=f"{reason} (Kicked by {interaction.user})")
+        mod_log.record(interaction.guild.id, 'kick', interaction.user.id, user.id, reason)
         
         # Send success embed
         embed = discord.Embed(
@@ -859,6 +1354,7 @@ async def kick_prefix(ctx, user: discord.Member, *, reason="No reason provided")
     # Kick the user
     try:
         await user.kick(reason=f"{reason} (Kicked by {ctx.author})")
+        mod_log.record(ctx.guild.id, 'kick', ctx.author.id, user.id, reason)
         
         # Send success embed
         embed = discord.Embed(
@@ -888,7 +1384,132 @@ async def kick_prefix(ctx, user: discord.Member, *, reason="No reason provided")
         )
         await ctx.send(embed=embed)
 
+# ===== PAGED VIEWS =====
+class PagedView(discord.ui.View):
+    """Previous/next buttons over pages built on demand and cached while the view is alive"""
+    
+    def __init__(self, requester, last_page=None):
+        super().__init__(timeout=180)
+        self.requester = requester
+        self.last_page = last_page  # None until a page shows there is nothing after it
+        self.page = 0
+        self.message = None
+        self._rendered = {}  # page -> embed
+        self._update_buttons()
+    
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.last_page is not None and self.page >= self.last_page
+    
+    async def build_page(self, page, before_fetch):
+        """Build the embed for a page; await before_fetch() before any slow lookup"""
+        raise NotImplementedError
+    
+    async def render(self, page, before_fetch=None):
+        embed = self._rendered.get(page)
+        if embed is None:
+            embed = self._rendered[page] = await self.build_page(page, before_fetch)
+        if page == self.page:
+            self._update_buttons()
+        return embed
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.requester.id:
+            await interaction.response.send_message("Only the moderator who opened this list can change pages.", ephemeral=True)
+            return False
+        return True
+    
+    async def _show(self, interaction, page):
+        deferred = False
+        
+        async def defer():
+            nonlocal deferred
+            await interaction.response.defer()
+            deferred = True
+        
+        self.page = page
+        embed = await self.render(page, defer)
+        if deferred:
+            await interaction.edit_original_response(embed=embed, view=self)
+        else:
+            await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page - 1)
+    
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+    
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 # ===== WARNS COMMAND =====
+WARNS_PAGE_SIZE = 5  # Warnings per page of the warns view
+WARNS_REASON_LIMIT = 650  # Characters of each reason shown, so a full page fits Discord's 4096-character description
+
+def shorten(text, limit):
+    """Cut text to at most limit characters, marking the cut"""
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+def create_warns_embed(user, warnings, moderators, offset, total, page, pages, requester_name):
+    """Create the embed for one page of a user's warnings"""
+    lines = []
+    for i, warning in enumerate(warnings, offset + 1):
+        time_ago = (datetime.utcnow() - warning['timestamp']).days
+        lines.append(
+            f"**#{i}** - {time_ago} day(s) ago\n"
+            f"**Reason:** {shorten(warning['reason'], WARNS_REASON_LIMIT)}\n"
+            f"**By:** {moderators[warning['moderator_id']].mention}\n"
+            f"**Date:** {warning['timestamp'].strftime('%Y-%m-%d %H:%M')}\n"
+        )
+    
+    embed = discord.Embed(
+        title=f"⚠️ Warnings for {user.name}",
+        description=f"**Total Warnings:** {total}\n\n" + "\n".join(lines),
+        color=discord.Color.orange()
+    )
+    embed.set_thumbnail(url=user.display_avatar.url)
+    embed.set_footer(text=f"User ID: {user.id} • Page {page + 1}/{pages} • Requested by {requester_name}")
+    return embed
+
+class WarnsView(PagedView):
+    """A user's warnings, one page read from the store when first shown"""
+    
+    def __init__(self, guild, user, requester, total):
+        self.guild = guild
+        self.user = user
+        self.total = total
+        self.pages = max(1, -(-total // WARNS_PAGE_SIZE))
+        super().__init__(requester, last_page=self.pages - 1)
+    
+    async def build_page(self, page, before_fetch):
+        offset = page * WARNS_PAGE_SIZE
+        warnings = warnings_store.get_warnings_page(self.guild.id, self.user.id, offset, WARNS_PAGE_SIZE)
+        moderator_ids = [warning['moderator_id'] for warning in warnings]
+        if before_fetch and not members_cached(self.guild, moderator_ids):
+            await before_fetch()
+        moderators = await get_members_from_ids(self.guild, moderator_ids)
+        return create_warns_embed(
+            self.user, warnings, moderators, offset, self.total, page, self.pages, self.requester.name
+        )
+
+def create_no_warnings_embed(user):
+    embed = discord.Embed(
+        title="📋 User Warnings",
+        description=f"{user.mention} has **no warnings**.",
+        color=discord.Color.green()
+    )
+    embed.set_footer(text=f"User ID: {user.id}")
+    return embed
+
 @bot.tree.command(name="warns", description="View warnings for a user")
 @app_commands.describe(
     user="The user to check warnings for"
@@ -904,91 +1525,42 @@ async def warns_slash(interaction: discord.Interaction, user: discord.Member):
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
-    user_warnings = warnings_storage[user.id]
-    
-    if not user_warnings:
-        embed = discord.Embed(
-            title="📋 User Warnings",
-            description=f"{user.mention} has **no warnings**.",
-            color=discord.Color.green()
-        )
-        embed.set_footer(text=f"User ID: {user.id}")
-        await interaction.response.send_message(embed=embed)
+    total = warnings_store.count_warnings(interaction.guild.id, user.id)
+    if not total:
+        await interaction.response.send_message(embed=create_no_warnings_embed(user))
         return
     
-    # Create paginated embed for warnings
-    warnings_text = ""
-    for i, warning in enumerate(user_warnings, 1):
-        # Handle moderator (could be ID or object)
-        if hasattr(warning['moderator'], 'name'):
-            moderator_name = warning['moderator'].name
-            moderator_mention = warning['moderator'].mention
-        else:
-            # Try to get member from ID
-            moderator_obj = get_member_from_id(interaction.guild, warning.get('moderator_id', 0))
-            moderator_name = moderator_obj.name
-            moderator_mention = moderator_obj.mention
-        
-        time_ago = (datetime.utcnow() - warning['timestamp']).days
-        warnings_text += f"**#{i}** - {time_ago} day(s) ago\n"
-        warnings_text += f"**Reason:** {warning['reason']}\n"
-        warnings_text += f"**By:** {moderator_mention}\n"
-        warnings_text += f"**Date:** {warning['timestamp'].strftime('%Y-%m-%d %H:%M')}\n\n"
+    # Only the first page is read and rendered; defer first if its moderators need REST calls
+    view = WarnsView(interaction.guild, user, interaction.user, total)
+    send = interaction.response.send_message
     
-    embed = discord.Embed(
-        title=f"⚠️ Warnings for {user.name}",
-        description=f"**Total Warnings:** {len(user_warnings)}\n\n{warnings_text}",
-        color=discord.Color.orange()
-    )
-    embed.set_thumbnail(url=user.display_avatar.url)
-    embed.set_footer(text=f"User ID: {user.id} • Requested by {interaction.user.name}")
+    async def defer():
+        nonlocal send
+        await interaction.response.defer()
+        send = interaction.followup.send
     
-    await interaction.response.send_message(embed=embed)
+    embed = await view.render(0, defer)
+    if view.pages > 1:
+        await send(embed=embed, view=view)
+        view.message = await interaction.original_response()
+    else:
+        await send(embed=embed)
 
 @bot.command(name='warns')
 @commands.has_permissions(administrator=True)
 async def warns_prefix(ctx, user: discord.Member):
     """View warnings for a user (Administrator only)"""
-    user_warnings = warnings_storage[user.id]
-    
-    if not user_warnings:
-        embed = discord.Embed(
-            title="📋 User Warnings",
-            description=f"{user.mention} has **no warnings**.",
-            color=discord.Color.green()
-        )
-        embed.set_footer(text=f"User ID: {user.id}")
-        await ctx.send(embed=embed)
+    total = warnings_store.count_warnings(ctx.guild.id, user.id)
+    if not total:
+        await ctx.send(embed=create_no_warnings_embed(user))
         return
     
-    # Create paginated embed for warnings
-    warnings_text = ""
-    for i, warning in enumerate(user_warnings, 1):
-        # Handle moderator (could be ID or object)
-        if hasattr(warning['moderator'], 'name'):
-            moderator_name = warning['moderator'].name
-            moderator_mention = warning['moderator'].mention
-        else:
-            # Try to get member from ID
-            moderator_obj = get_member_from_id(ctx.guild, warning.get('moderator_id', 0))
-            moderator_name = moderator_obj.name
-            moderator_mention = moderator_obj.mention
-        
-        time_ago = (datetime.utcnow() - warning['timestamp']).days
-        warnings_text += f"**#{i}** - {time_ago} day(s) ago\n"
-        warnings_text += f"**Reason:** {warning['reason']}\n"
-        warnings_text += f"**By:** {moderator_mention}\n"
-        warnings_text += f"**Date:** {warning['timestamp'].strftime('%Y-%m-%d %H:%M')}\n\n"
-    
-    embed = discord.Embed(
-        title=f"⚠️ Warnings for {user.name}",
-        description=f"**Total Warnings:** {len(user_warnings)}\n\n{warnings_text}",
-        color=discord.Color.orange()
-    )
-    embed.set_thumbnail(url=user.display_avatar.url)
-    embed.set_footer(text=f"User ID: {user.id} • Requested by {ctx.author.name}")
-    
-    await ctx.send(embed=embed)
+    view = WarnsView(ctx.guild, user, ctx.author, total)
+    embed = await view.render(0)
+    if view.pages > 1:
+        view.message = await ctx.send(embed=embed, view=view)
+    else:
+        await ctx.send(embed=embed)
 
 # ===== CLEARWARNS COMMAND =====
 @bot.tree.command(name="clearwarns", description="Clear all warnings for a user")
@@ -1006,9 +1578,11 @@ async def clearwarns_slash(interaction: discord.Interaction, user: discord.Membe
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
-    user_warnings = warnings_storage[user.id]
+    count = warnings_store.clear_warnings(interaction.guild.id, user.id, interaction.user.id)
+    if count:
+        mod_log.record(interaction.guild.id, 'clearwarns', interaction.user.id, user.id, f"Cleared {count} warning(s)")
     
-    if not user_warnings:
+    if not count:
         embed = discord.Embed(
             title="📋 Clear Warnings",
             description=f"{user.mention} has no warnings to clear.",
@@ -1017,11 +1591,6 @@ async def clearwarns_slash(interaction: discord.Interaction, user: discord.Membe
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
-    # Clear warnings
-    count = len(user_warnings)
-    warnings_storage[user.id].clear()
-    save_warnings()  # Save immediately
-    
     embed = discord.Embed(
         title="✅ Warnings Cleared",
         description=f"Cleared **{count}** warning(s) for {user.mention}.",
@@ -1036,9 +1605,11 @@ async def clearwarns_slash(interaction: discord.Interaction, user: discord.Membe
 @commands.has_permissions(administrator=True)
 async def clearwarns_prefix(ctx, user: discord.Member):
     """Clear all warnings for a user (Administrator only)"""
-    user_warnings = warnings_storage[user.id]
+    count = warnings_store.clear_warnings(ctx.guild.id, user.id, ctx.author.id)
+    if count:
+        mod_log.record(ctx.guild.id, 'clearwarns', ctx.author.id, user.id, f"Cleared {count} warning(s)")
     
-    if not user_warnings:
+    if not count:
         embed = discord.Embed(
             title="📋 Clear Warnings",
             description=f"{user.mention} has no warnings to clear.",
@@ -1047,11 +1618,6 @@ async def clearwarns_prefix(ctx, user: discord.Member):
         await ctx.send(embed=embed)
         return
     
-    # Clear warnings
-    count = len(user_warnings)
-    warnings_storage[user.id].clear()
-    save_warnings()  # Save immediately
-    
     embed = discord.Embed(
         title="✅ Warnings Cleared",
         description=f"Cleared **{count}** warning(s) for {user.mention}.",
@@ -1062,160 +1628,254 @@ async def clearwarns_prefix(ctx, user: discord.Member):
     
     await ctx.send(embed=embed)
 
-# ===== SEND MESSAGE COMMAND =====
-@bot.tree.command(name="sendmessage", description="Send a message to a specific channel")
+# ===== MODLOG COMMAND =====
+MODLOG_PAGE_SIZE = 10  # Entries per page of the modlog view
+MODLOG_REASON_LIMIT = 250  # Characters of each reason shown, so a full page fits Discord's 4096-character description
+MODLOG_ICONS = {'warn': '⚠️', 'clearwarns': '🧹', 'kick': '👢', 'ban': '🔨'}
+
+def create_modlog_embed(entries, page, filters, requester_name):
+    """Create the embed for one page of the moderation log"""
+    lines = []
+    for entry in entries:
+        unix = int((entry['timestamp'] - datetime(1970, 1, 1)).total_seconds())
+        lines.append(
+            f"{MODLOG_ICONS.get(entry['action'], '•')} **{entry['action']}** <@{entry['target_id']}> "
+            f"by <@{entry['actor_id']}> • <t:{unix}:R>\n"
+            f"**Reason:** {shorten(entry['reason'] or 'No reason provided', MODLOG_REASON_LIMIT)}"
+        )
+    embed = discord.Embed(
+        title="📜 Moderation Log",
+        description="\n\n".join(lines) or "No matching moderation actions.",
+        color=discord.Color.blue()
+    )
+    if filters:
+        embed.add_field(name="Filters", value=filters, inline=False)
+    embed.set_footer(text=f"Page {page + 1} • Requested by {requester_name}")
+    return embed
+
+class ModLogView(PagedView):
+    """Moderation log pages, each one keyset query newest-first"""
+    
+    def __init__(self, guild, requester, target=None, moderator=None, days=None):
+        self.guild = guild
+        self.query = {
+            'target_id': target.id if target else None,
+            'actor_id': moderator.id if moderator else None,
+            'since': datetime.utcnow() - timedelta(days=days) if days else None,
+        }
+        self.filters = " • ".join(
+            part for part in (
+                f"User: {target.mention}" if target else None,
+                f"Moderator: {moderator.mention}" if moderator else None,
+                f"Last {days} day(s)" if days else None,
+            ) if part
+        )
+        self._cursors = [None]  # page -> keyset cursor to start after
+        super().__init__(requester)
+    
+    async def build_page(self, page, before_fetch):
+        # One extra row tells us whether there is a next page
+        entries = mod_log.query(
+            self.guild.id, before=self._cursors[page], limit=MODLOG_PAGE_SIZE + 1, **self.query
+        )
+        if len(entries) > MODLOG_PAGE_SIZE:
+            entries = entries[:MODLOG_PAGE_SIZE]
+            if len(self._cursors) == page + 1:
+                self._cursors.append(mod_log.cursor(entries[-1]))
+        else:
+            self.last_page = page
+        return create_modlog_embed(entries, page, self.filters, self.requester.name)
+
+@bot.tree.command(name="modlog", description="Browse the moderation log (Admin only)")
 @app_commands.describe(
-    channel_id="The channel ID to send the message to",
-    message="The message to send"
+    user="Only actions taken against this user",
+    moderator="Only actions taken by this moderator",
+    days="Only actions from the last N days"
 )
-async def sendmessage_slash(interaction: discord.Interaction, channel_id: str, message: str):
+async def modlog_slash(interaction: discord.Interaction, user: typing.Optional[discord.User] = None,
+                       moderator: typing.Optional[discord.User] = None,
+                       days: typing.Optional[app_commands.Range[int, 1, 3650]] = None):
     # Check if user has Administrator permission
     if not interaction.user.guild_permissions.administrator:
         embed = discord.Embed(
             title="❌ Permission Denied",
-            description="You need **Administrator** permission to send messages!",
+            description="You need **Administrator** permission to view the moderation log!",
             color=discord.Color.red()
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
     
+    view = ModLogView(interaction.guild, interaction.user, user, moderator, days)
+    embed = await view.render(0)
+    if view.last_page == 0:
+        await interaction.response.send_message(embed=embed)
+        return
+    await interaction.response.send_message(embed=embed, view=view)
+    view.message = await interaction.original_response()
+
+@bot.command(name='modlog')
+@commands.has_permissions(administrator=True)
+async def modlog_prefix(ctx, user: typing.Optional[discord.User] = None, days: typing.Optional[int] = None):
+    """Browse the moderation log, optionally for one user and/or the last N days"""
+    view = ModLogView(ctx.guild, ctx.author, user, days=days)
+    embed = await view.render(0)
+    if view.last_page == 0:
+        await ctx.send(embed=embed)
+        return
+    view.message = await ctx.send(embed=embed, view=view)
+
+# ===== SEND MESSAGE COMMAND =====
+CHANNEL_GROUPS_FILE = os.environ.get('CHANNEL_GROUPS_FILE', 'channel_groups.json')
+BROADCAST_CONCURRENCY = 5  # Channels resolved and sent to at once
+
+def load_channel_groups():
+    """Named channel groups, e.g. {"announcements": [id, id, ...]}"""
     try:
-        # Convert channel_id to integer
-        channel_id_int = int(channel_id)
-        
-        # Get the channel
-        channel = bot.get_channel(channel_id_int)
-        
-        if channel is None:
-            # Try to fetch the channel if not in cache
-            try:
-                channel = await bot.fetch_channel(channel_id_int)
-            except:
-                embed = discord.Embed(
-                    title="❌ Channel Not Found",
-                    description=f"Could not find channel with ID: `{channel_id}`",
-                    color=discord.Color.red()
-                )
-                embed.add_field(
-                    name="How to get Channel ID",
-                    value="Enable Developer Mode in Discord, right-click channel → Copy ID",
-                    inline=False
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
-        
-        # Check if bot has permission to send messages in that channel
-        if not channel.permissions_for(channel.guild.me).send_messages:
-            embed = discord.Embed(
-                title="❌ Permission Error",
-                description=f"I don't have permission to send messages in {channel.mention}",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-        
-        # Send the message
-        await channel.send(message)
-        
-        # Send success embed
-        embed = discord.Embed(
-            title="✅ Message Sent",
-            description=f"Message sent to {channel.mention}",
-            color=discord.Color.green()
-        )
-        embed.add_field(name="Channel", value=channel.mention, inline=True)
-        embed.add_field(name="Channel ID", value=f"`{channel_id}`", inline=True)
-        embed.add_field(name="Message", value=message[:100] + "..." if len(message) > 100 else message, inline=False)
-        embed.set_footer(text=f"Sent by {interaction.user.name}")
-        embed.timestamp = datetime.utcnow()
-        
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-        
-    except ValueError:
-        embed = discord.Embed(
-            title="❌ Invalid Channel ID",
-            description=f"`{channel_id}` is not a valid channel ID. Channel IDs should be numbers only.",
-            color=discord.Color.red()
-        )
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        with open(CHANNEL_GROUPS_FILE, 'r') as f:
+            return {name.lower(): [int(channel_id) for channel_id in ids] for name, ids in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️  Error loading {CHANNEL_GROUPS_FILE}: {e}")
+        return {}
+
+def parse_channel_targets(text):
+    """Turn channel IDs, channel mentions and group names into (channel_ids, invalid tokens)"""
+    groups = None
+    channel_ids = []
+    invalid = []
+    for token in text.replace(',', ' ').split():
+        token = token.strip('<#>')
+        if token.isdigit():
+            channel_ids.append(int(token))
+            continue
+        if groups is None:
+            groups = load_channel_groups()
+        group = groups.get(token.lower())
+        if group is None:
+            invalid.append(token)
+        else:
+            channel_ids.extend(group)
+    return list(dict.fromkeys(channel_ids)), invalid
+
+async def send_to_channel(channel_id, message):
+    """Send to one channel; returns (channel or None, error or None)"""
+    channel = await channel_resolver.resolve(channel_id)
+    if channel is None:
+        return None, "Channel not found"
+    
+    # Check if bot has permission to send messages in that channel
+    guild = getattr(channel, 'guild', None)
+    if guild and not channel.permissions_for(guild.me).send_messages:
+        return channel, "Missing permission"
+    
+    try:
+        await outbound.send(MODERATION, channel_route(channel.id), lambda: channel.send(message))
     except Exception as e:
+        return channel, str(e)
+    return channel, None
+
+async def broadcast_message(channel_ids, message):
+    """Send to many channels with bounded concurrency; returns results and wall-clock seconds"""
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    
+    async def send_one(channel_id):
+        async with semaphore:
+            return (channel_id, *await send_to_channel(channel_id, message))
+    
+    started = time.perf_counter()
+    results = await asyncio.gather(*(send_one(channel_id) for channel_id in channel_ids))
+    return results, time.perf_counter() - started
+
+def create_broadcast_embed(results, invalid, message, elapsed, sender_name):
+    """Create the aggregated result embed for a (multi-channel) send"""
+    sent = [channel for _, channel, error in results if error is None]
+    failed = [(channel_id, channel, error) for channel_id, channel, error in results if error is not None]
+    
+    if sent and not failed and not invalid:
+        title, color = "✅ Message Sent", discord.Color.green()
+    elif sent:
+        title, color = "⚠️ Message Partially Sent", discord.Color.orange()
+    else:
+        title, color = "❌ Message Not Sent", discord.Color.red()
+    
+    embed = discord.Embed(
+        title=title,
+        description=f"Sent to **{len(sent)}/{len(results)}** channel(s) in {elapsed:.2f}s",
+        color=color
+    )
+    if sent:
+        listing = "\n".join(f"{channel.mention} (`{channel.id}`)" for channel in sent)
+        embed.add_field(name="Sent", value=listing[:1024], inline=False)
+    if failed or invalid:
+        lines = [
+            f"{channel.mention if channel else f'`{channel_id}`'} - {error}"
+            for channel_id, channel, error in failed
+        ]
+        lines += [f"`{token}` - Not a channel ID or group" for token in invalid]
+        embed.add_field(name="Failed", value="\n".join(lines)[:1024], inline=False)
+    if any(channel is None for _, channel, _ in failed) or invalid:
+        embed.add_field(
+            name="How to get Channel ID",
+            value="Enable Developer Mode in Discord, right-click channel → Copy ID",
+            inline=False
+        )
+    embed.add_field(name="Message", value=message[:100] + "..." if len(message) > 100 else message, inline=False)
+    embed.set_footer(text=f"Sent by {sender_name}")
+    embed.timestamp = datetime.utcnow()
+    return embed
+
+def create_no_targets_embed(channel_spec):
+    return discord.Embed(
+        title="❌ Invalid Channel ID",
+        description=(
+            f"`{channel_spec}` has no valid channel IDs. Use channel IDs (numbers only), "
+            f"separated by spaces or commas, or a channel group name."
+        ),
+        color=discord.Color.red()
+    )
+
+@bot.tree.command(name="sendmessage", description="Send a message to one or more channels")
+@app_commands.describe(
+    channel_id="Channel IDs (space or comma separated) or a channel group name",
+    message="The message to send"
+)
+async def sendmessage_slash(interaction: discord.Interaction, channel_id: str, message: str):
+    # Check if user has Administrator permission
+    if not interaction.user.guild_permissions.administrator:
         embed = discord.Embed(
-            title="❌ Error",
-            description=f"Failed to send message: {str(e)}",
+            title="❌ Permission Denied",
+            description="You need **Administrator** permission to send messages!",
             color=discord.Color.red()
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
+    channel_ids, invalid = parse_channel_targets(channel_id)
+    if not channel_ids:
+        await interaction.response.send_message(embed=create_no_targets_embed(channel_id), ephemeral=True)
+        return
+    
+    # Sending to many channels can outlast the 3 second response window
+    await interaction.response.defer(ephemeral=True)
+    results, elapsed = await broadcast_message(channel_ids, message)
+    embed = create_broadcast_embed(results, invalid, message, elapsed, interaction.user.name)
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 @bot.command(name='sendmessage', aliases=['send', 'sm'])
 @commands.has_permissions(administrator=True)
 async def sendmessage_prefix(ctx, channel_id: str, *, message: str):
-    """Send a message to a specific channel (Administrator only)"""
-    try:
-        # Convert channel_id to integer
-        channel_id_int = int(channel_id)
-        
-        # Get the channel
-        channel = bot.get_channel(channel_id_int)
-        
-        if channel is None:
-            # Try to fetch the channel if not in cache
-            try:
-                channel = await bot.fetch_channel(channel_id_int)
-            except:
-                embed = discord.Embed(
-                    title="❌ Channel Not Found",
-                    description=f"Could not find channel with ID: `{channel_id}`",
-                    color=discord.Color.red()
-                )
-                embed.add_field(
-                    name="How to get Channel ID",
-                    value="Enable Developer Mode in Discord, right-click channel → Copy ID",
-                    inline=False
-                )
-                await ctx.send(embed=embed)
-                return
-        
-        # Check if bot has permission to send messages in that channel
-        if not channel.permissions_for(channel.guild.me).send_messages:
-            embed = discord.Embed(
-                title="❌ Permission Error",
-                description=f"I don't have permission to send messages in {channel.mention}",
-                color=discord.Color.red()
-            )
-            await ctx.send(embed=embed)
-            return
-        
-        # Send the message
-        await channel.send(message)
-        
-        # Send success embed
-        embed = discord.Embed(
-            title="✅ Message Sent",
-            description=f"Message sent to {channel.mention}",
-            color=discord.Color.green()
-        )
-        embed.add_field(name="Channel", value=channel.mention, inline=True)
-        embed.add_field(name="Channel ID", value=f"`{channel_id}`", inline=True)
-        embed.add_field(name="Message", value=message[:100] + "..." if len(message) > 100 else message, inline=False)
-        embed.set_footer(text=f"Sent by {ctx.author.name}")
-        embed.timestamp = datetime.utcnow()
-        
-        await ctx.send(embed=embed)
-        
-    except ValueError:
-        embed = discord.Embed(
-            title="❌ Invalid Channel ID",
-            description=f"`{channel_id}` is not a valid channel ID. Channel IDs should be numbers only.",
-            color=discord.Color.red()
-        )
-        await ctx.send(embed=embed)
-    except Exception as e:
-        embed = discord.Embed(
-            title="❌ Error",
-            description=f"Failed to send message: {str(e)}",
-            color=discord.Color.red()
-        )
-        await ctx.send(embed=embed)
+    """Send a message to one or more channels (Administrator only)
+
+    channel_id may be comma separated IDs, or quoted space separated IDs, or a channel group name.
+    """
+    channel_ids, invalid = parse_channel_targets(channel_id)
+    if not channel_ids:
+        await ctx.send(embed=create_no_targets_embed(channel_id))
+        return
+    
+    results, elapsed = await broadcast_message(channel_ids, message)
+    await ctx.send(embed=create_broadcast_embed(results, invalid, message, elapsed, ctx.author.name))
 
 # ===== COMMANDS COMMAND (DYNAMIC PERMISSION-BASED) =====
 @bot.tree.command(name="commands", description="Show all available commands based on your permissions")
@@ -1250,12 +1910,16 @@ async def commands_slash(interaction: discord.Interaction):
         admin_commands = ""
         admin_commands += "**Administrator Commands:**\n"
         admin_commands += "• `/warn`, `.warn @user [reason]` - Warn a user\n"
+        admin_commands += "• `/masswarn`, `.masswarn @users... [@role] [reason]` - Warn many users at once\n"
         admin_commands += "• `/kick`, `.kick @user [reason]` - Kick a user\n"
         admin_commands += "• `/ban`, `.ban @user [reason] [days]` - Ban a user\n"
         admin_commands += "• `/warns`, `.warns @user` - View user warnings\n"
+        admin_commands += "• `/modlog`, `.modlog [@user] [days]` - Browse the moderation log\n"
         admin_commands += "• `/clearwarns`, `.clearwarns @user` - Clear user warnings\n"
-        admin_commands += "• `/cs`, `.cs` - Clear all sniped messages in channel\n\n"
-        admin_commands += "• `/sendmessage`, `.sendmessage channel_id message` - Send message to channel\n\n"
+        admin_commands += "• `/cs`, `.cs` - Clear all sniped messages in channel\n"
+        admin_commands += "• `/snipestats`, `.snipestats` - Show snipe cache usage\n"
+        admin_commands += "• `/queuestats`, `.queuestats` - Show outbound queue and background job metrics\n\n"
+        admin_commands += "• `/sendmessage`, `.sendmessage channel_ids|group message` - Send message to one or more channels\n\n"
         
         embed.add_field(name="Admin Commands", value=admin_commands, inline=False)
     
@@ -1304,12 +1968,16 @@ async def commands_prefix(ctx):
         admin_commands = ""
         admin_commands += "**Administrator Commands:**\n"
         admin_commands += f"• `{prefixes[0]}warn @user [reason]` - Warn a user\n"
+        admin_commands += f"• `{prefixes[0]}masswarn @users... [@role] [reason]` - Warn many users at once\n"
         admin_commands += f"• `{prefixes[0]}kick @user [reason]` - Kick a user\n"
         admin_commands += f"• `{prefixes[0]}ban @user [days] [reason]` - Ban a user\n"
         admin_commands += f"• `{prefixes[0]}warns @user` - View user warnings\n"
+        admin_commands += f"• `{prefixes[0]}modlog [@user] [days]` - Browse the moderation log\n"
         admin_commands += f"• `{prefixes[0]}clearwarns @user` - Clear user warnings\n"
         admin_commands += f"• `{prefixes[0]}cs` - Clear all sniped messages in channel\n"
-        admin_commands += f"• `{prefixes[0]}sendmessage channel_id message` - Send message to channel\n"  
+        admin_commands += f"• `{prefixes[0]}snipestats` - Show snipe cache usage\n"
+        admin_commands += f"• `{prefixes[0]}queuestats` - Show outbound queue and background job metrics\n"
+        admin_commands += f"• `{prefixes[0]}sendmessage channel_ids|group message` - Send message to one or more channels\n"  
         
         embed.add_field(name="Admin Commands", value=admin_commands, inline=False)
     
@@ -1327,17 +1995,6 @@ async def main():
     print("🤖 Starting Discord Bot with Self-Pinging Keep-Alive")
     print("=" * 50)
     
-    # Start keep-alive system
-    if KEEP_ALIVE_AVAILABLE:
-        success = keep_alive()
-        if success:
-            print("✅ Keep-alive system started successfully")
-            print("⏰ Bot will auto-ping itself every 5 minutes")
-        else:
-            print("⚠️  Keep-alive failed to start")
-    else:
-        print("⚠️  Keep-alive disabled - bot may sleep on free tier")
-    
     # Get and validate token
     token = os.getenv('DISCORD_TOKEN')
     if not token:
@@ -1352,7 +2009,19 @@ async def main():
         print("🔑 Reset token at Discord Developer Portal")
         return
     
+    # Start keep-alive system once the token checks have passed, so their early returns leave nothing open
+    if KEEP_ALIVE_AVAILABLE:
+        success = await keep_alive(health=bot_health, metrics=metrics)
+        if success:
+            print("✅ Keep-alive system started successfully")
+            print("⏰ Bot will auto-ping itself every 5 minutes")
+        else:
+            print("⚠️  Keep-alive failed to start")
+    else:
+        print("⚠️  Keep-alive disabled - bot may sleep on free tier")
+    
     print("✅ Token found, connecting to Discord...")
+    warnings_writer.start()
     
     try:
         await bot.start(token)
@@ -1366,12 +2035,19 @@ async def main():
         print("   5. Redeploy")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        if KEEP_ALIVE_AVAILABLE:
+            await stop_keep_alive()
 
 # Save warnings on shutdown
 def save_on_exit():
-    """Save warnings when bot shuts down"""
+    """Save warnings and snipes when bot shuts down"""
     print("💾 Saving warnings before shutdown...")
-    save_warnings()
+    warnings_writer.stop()
+    warnings_store.close()
+    snipe_storage.close()
+    job_queue.close()
+    mod_log.close()
     print("✅ Warnings saved successfully")
 
 atexit.register(save_on_exit)
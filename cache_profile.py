@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import logging
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+CACHE_PROFILE = os.environ.get("CACHE_PROFILE", "default")
+CACHE_REPORT_FILE = os.environ.get("CACHE_REPORT_FILE", "cache_report.json")  # Last report per profile
+
+# Gateway intents the bot never reads; the lean profile turns them off so their state isn't cached
+UNUSED_INTENTS = (
+    "voice_states", "typing", "invites", "webhooks", "integrations",
+    "guild_scheduled_events", "auto_moderation_configuration", "auto_moderation_execution",
+)
+
+# Snipes only see deletions of messages still in the message cache, so keep it big enough for that
+CACHE_PROFILES = {
+    "default": {"max_messages": 1000, "chunk_guilds_at_startup": None, "member_cache": "default"},
+    "lean": {"max_messages": 250, "chunk_guilds_at_startup": False, "member_cache": "none"},
+}
+
+
+def caches_members(profile=CACHE_PROFILE):
+    """Whether the profile keeps a member cache (needed to list everyone with a role)"""
+    return CACHE_PROFILES.get(profile, CACHE_PROFILES["default"])["member_cache"] != "none"
+
+
+def client_options(intents, profile=CACHE_PROFILE):
+    """Keyword arguments for commands.Bot under a cache profile"""
+    if profile not in CACHE_PROFILES:
+        logger.warning(f"⚠️  Unknown cache profile {profile!r}, using default")
+        profile = "default"
+    settings = CACHE_PROFILES[profile]
+    max_messages = int(os.environ.get("MESSAGE_CACHE_SIZE", settings["max_messages"]))
+
+    if settings["member_cache"] == "none":
+        for name in UNUSED_INTENTS:
+            setattr(intents, name, False)
+        member_cache_flags = discord.MemberCacheFlags.none()
+    else:
+        member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+
+    chunk = settings["chunk_guilds_at_startup"]
+    return {
+        "intents": intents,
+        "max_messages": max_messages or None,
+        "chunk_guilds_at_startup": intents.members if chunk is None else chunk,  # Chunking needs the members intent
+        "member_cache_flags": member_cache_flags,
+    }
+
+
+def rss_bytes():
+    """Current resident set size, or peak RSS where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cache_report(client, profile=CACHE_PROFILE):
+    """Cache sizes and RSS once the bot is ready"""
+    return {
+        "profile": profile,
+        "rss_mb": round(rss_bytes() / (1024 * 1024), 1),
+        "guilds": len(client.guilds),
+        "users": len(client.users),
+        "members": sum(len(guild.members) for guild in client.guilds),
+        "messages": len(client.cached_messages),
+        "max_messages": client._connection.max_messages,
+    }
+
+
+def compare_to_baseline(report, path=CACHE_REPORT_FILE):
+    """Remember this run's report under its profile; returns the default profile's last report, if any.
+
+    Both are taken at the same point (first ready), so the difference is what the profile saves.
+    """
+    try:
+        with open(path, "r") as f:
+            reports = json.load(f)
+    except FileNotFoundError:
+        reports = {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️  Ignoring unreadable {path}: {e}")
+        reports = {}
+    reports[report["profile"]] = report
+    try:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(reports, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️  Could not save {path}: {e}")
+    return None if report["profile"] == "default" else reports.get("default")
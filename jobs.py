@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOBS_FILE = os.environ.get("JOBS_FILE", "jobs.journal")
+JOB_WORKERS = 3
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 5.0  # Seconds before the first retry; doubles after each failure
+RETRY_MAX_DELAY = 600.0
+COMPACT_EVERY = 200  # Finished jobs before the journal is rewritten with only pending ones
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the user has DMs disabled)"""
+
+
+class JobQueue:
+    """Background side-effects with a worker pool, retries with backoff and a durable journal.
+
+    Every job is appended to the journal before it runs and marked done or failed
+    afterwards, so jobs still pending at shutdown or crash are picked up on restart.
+    Journal records are group-committed by a flusher task that writes and fsyncs
+    off the event loop; a new job reaches the workers once its record is on disk.
+    """
+
+    def __init__(self, path=JOBS_FILE, workers=JOB_WORKERS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.handlers = {}  # kind -> async handler(payload)
+        self._pending = {}  # job id -> job dict
+        self._ready = None
+        self._tasks = []
+        self._unwritten = []  # Journal lines waiting for the flusher
+        self._unreleased = []  # Job ids to hand to the workers once their lines are written
+        self._flush_needed = None
+        self._io_lock = threading.Lock()  # Journal file writes and compaction
+        self._finished_since_compact = 0
+        self.next_id = 1
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.journal_writes = 0
+        self._load()
+        self._journal = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        """Replay the journal to find jobs that never finished, cutting off a torn tail"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated record")
+                    record = json.loads(line)
+                except ValueError:
+                    # Appending after the fragment would glue the next record onto it
+                    logger.warning(f"⚠️  Truncating torn record at end of {self.path}")
+                    f.close()
+                    with open(self.path, "r+b") as journal:
+                        journal.truncate(offset)
+                        os.fsync(journal.fileno())
+                    break
+                offset += len(line)
+                self.next_id = max(self.next_id, record["id"] + 1)
+                if record["op"] == "add":
+                    self._pending[record["id"]] = record["job"]
+                elif record["op"] == "retry" and record["id"] in self._pending:
+                    self._pending[record["id"]]["attempts"] = record["attempts"]
+                else:
+                    self._pending.pop(record["id"], None)
+        if self._pending:
+            logger.info(f"✅ Recovered {len(self._pending)} pending job(s) from {self.path}")
+
+    def _write(self, record, release=None):
+        """Queue a journal record; release is a job id to start once the record is durable"""
+        self._unwritten.append(json.dumps(record) + "\n")
+        if release is not None:
+            self._unreleased.append(release)
+        if self._flush_needed is not None:
+            self._flush_needed.set()
+        else:
+            self._flush_now()  # Not started yet: no loop to flush from
+
+    def _take_batch(self):
+        """Swap out the unwritten lines, plus a compacted journal if one is due"""
+        lines, self._unwritten = self._unwritten, []
+        release, self._unreleased = self._unreleased, []
+        compacted = None
+        if self._finished_since_compact >= COMPACT_EVERY:
+            # The pending jobs as of now are exactly the journal with these lines applied
+            compacted = [
+                json.dumps({"op": "add", "id": job_id, "job": job}) + "\n"
+                for job_id, job in self._pending.items()
+            ]
+            self._finished_since_compact = 0
+        return lines, release, compacted
+
+    def _write_batch(self, lines, compacted):
+        """Append and fsync one batch, or replace the journal with a compacted one (blocking)"""
+        with self._io_lock:
+            if compacted is not None:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(compacted)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal.close()
+                os.replace(tmp_path, self.path)
+                self._journal = open(self.path, "a", encoding="utf-8")
+            elif lines:
+                self._journal.writelines(lines)
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            self.journal_writes += 1
+
+    def _flush_now(self):
+        lines, release, compacted = self._take_batch()
+        self._write_batch(lines, compacted)
+        if self._ready is not None:
+            for job_id in release:
+                self._ready.put_nowait(job_id)
+
+    async def _flusher(self):
+        while True:
+            await self._flush_needed.wait()
+            self._flush_needed.clear()
+            lines, release, compacted = self._take_batch()
+            try:
+                await asyncio.to_thread(self._write_batch, lines, compacted)
+            except OSError as e:
+                logger.error(f"❌ Could not write {self.path}: {e}")
+            for job_id in release:
+                self._ready.put_nowait(job_id)
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload):
+        """Durably record a job and hand it to the workers"""
+        job_id = self.next_id
+        self.next_id += 1
+        job = {"kind": kind, "payload": payload, "attempts": 0}
+        self._pending[job_id] = job
+        self._write({"op": "add", "id": job_id, "job": job}, release=job_id if self._ready is not None else None)
+        return job_id
+
+    def start(self):
+        """Start the workers and queue every recovered job"""
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._flush_needed = asyncio.Event()
+        for job_id in self._pending:
+            self._ready.put_nowait(job_id)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._flusher()))
+        logger.info(f"✅ Job queue started with {self.workers} worker(s)")
+
+    def _finish(self, job_id, op, **fields):
+        self._pending.pop(job_id, None)
+        self._finished_since_compact += 1
+        self._write({"op": op, "id": job_id, **fields})
+
+    async def _worker(self):
+        while True:
+            job_id = await self._ready.get()
+            job = self._pending.get(job_id)
+            if job is None:
+                continue
+            handler = self.handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise PermanentJobError(f"no handler for {job['kind']}")
+                await handler(job["payload"])
+            except PermanentJobError as e:
+                self.failed += 1
+                self._finish(job_id, "failed", error=str(e))
+            except Exception as e:
+                job["attempts"] += 1
+                if job["attempts"] >= self.max_attempts:
+                    self.failed += 1
+                    logger.error(f"❌ Job {job_id} ({job['kind']}) failed after {job['attempts']} attempts: {e}")
+                    self._finish(job_id, "failed", error=str(e))
+                    continue
+                self.retried += 1
+                self._write({"op": "retry", "id": job_id, "attempts": job["attempts"]})
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1))
+                delay *= random.uniform(0.5, 1.0)  # Jitter so retries don't line up
+                asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, job_id)
+            else:
+                self.succeeded += 1
+                self._finish(job_id, "done")
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "journal_writes": self.journal_writes,
+        }
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._flush_now()  # Waits for a batch already being written by the flusher thread
+        with self._io_lock:
+            self._journal.close()
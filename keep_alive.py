@@ -1,6 +1,6 @@
-from flask import Flask
-from threading import Thread
-import requests
+from aiohttp import web
+import aiohttp
+import asyncio
 import time
 import os
 import logging
@@ -9,11 +9,14 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+PING_INTERVAL = 300  # Seconds between self-pings
+STARTED_AT = time.time()
 
-@app.route('/')
-def home():
-    return """
+# Set by keep_alive(); without them /health is static and /metrics is empty
+health_check = None  # () -> (ready, details dict)
+metrics_registry = None  # MetricsRegistry
+
+HOME_PAGE = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -42,24 +45,45 @@ def home():
     </html>
     """
 
-@app.route('/ping')
-def ping():
-    return {"status": "alive", "timestamp": time.time()}, 200
+routes = web.RouteTableDef()
+
+@routes.get('/')
+async def home(request):
+    return web.Response(text=HOME_PAGE, content_type='text/html')
+
+@routes.get('/ping')
+async def ping(request):
+    now = time.time()
+    return web.json_response({"status": "alive", "timestamp": now, "uptime_seconds": round(now - STARTED_AT)})
 
-@app.route('/health')
-def health():
-    return {"status": "healthy", "service": "discord-bot"}, 200
+@routes.get('/health')
+async def health(request):
+    if health_check is None:
+        return web.json_response({"status": "healthy", "service": "discord-bot"})
+    ready, details = health_check()
+    return web.json_response({"service": "discord-bot", **details}, status=200 if ready else 503)
+
+@routes.get('/metrics')
+async def metrics(request):
+    text = metrics_registry.render() if metrics_registry is not None else ""
+    return web.Response(body=text.encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+app = web.Application()
+app.add_routes(routes)
 
 class SelfPinger:
+    """Pings our own /ping from a task on the bot's event loop, over one reused ClientSession"""
+
     def __init__(self):
         self.last_ping = None
-        self.is_running = True
-        
+        self.session = None
+        self.task = None
+
     def get_own_url(self):
         """Get the bot's own URL on Render"""
         render_service_name = os.environ.get('RENDER_SERVICE_NAME', 'discord-bot')
         render_external_url = os.environ.get('RENDER_EXTERNAL_URL')
-        
+
         if render_external_url:
             return render_external_url
         elif 'RENDER' in os.environ:
@@ -68,81 +92,90 @@ class SelfPinger:
         else:
             # Local development
             return "http://localhost:8080"
-    
-    def ping_self(self):
+
+    async def ping_self(self):
         """Ping our own server to keep it awake"""
         url = self.get_own_url()
-        
-        while self.is_running:
+
+        while True:
             try:
-                response = requests.get(f"{url}/ping", timeout=10)
-                now = time.strftime("%H:%M:%S")
-                
-                if response.status_code == 200:
-                    logger.info(f"💓 [{now}] Self-ping successful - Status: {response.status_code}")
-                    self.last_ping = now
-                else:
-                    logger.warning(f"⚠️  [{now}] Self-ping failed - Status: {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
+                async with self.session.get(f"{url}/ping") as response:
+                    now = time.strftime("%H:%M:%S")
+
+                    if response.status == 200:
+                        logger.info(f"💓 [{now}] Self-ping successful - Status: {response.status}")
+                        self.last_ping = now
+                    else:
+                        logger.warning(f"⚠️  [{now}] Self-ping failed - Status: {response.status}")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 now = time.strftime("%H:%M:%S")
-                logger.error(f"❌ [{now}] Self-ping error: {e}")
+                logger.error(f"❌ [{now}] Self-ping error: {e!r}")
             except Exception as e:
                 now = time.strftime("%H:%M:%S")
                 logger.error(f"❌ [{now}] Unexpected error: {e}")
-            
-            # Wait 5 minutes (300 seconds) before next ping
-            for _ in range(300):  # Check every second if we should stop
-                if not self.is_running:
-                    break
-                time.sleep(1)
-    
+
+            # Wait 5 minutes before next ping; stop() cancels the sleep
+            await asyncio.sleep(PING_INTERVAL)
+
     def start(self):
-        """Start the self-pinging thread"""
-        thread = Thread(target=self.ping_self, daemon=True)
-        thread.start()
+        """Start the self-pinging task"""
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        self.task = asyncio.get_running_loop().create_task(self.ping_self())
         logger.info("✅ Self-pinger started (pinging every 5 minutes)")
-        return thread
-    
-    def stop(self):
+        return self.task
+
+    async def stop(self):
         """Stop the self-pinging"""
-        self.is_running = False
+        if self.task:
+            self.task.cancel()
+        if self.session:
+            await self.session.close()
         logger.info("🛑 Self-pinger stopped")
 
 # Global pinger instance
 pinger = SelfPinger()
+runner = web.AppRunner(app, access_log=None)
 
-def run_flask():
-    """Run the Flask web server"""
+async def run_server():
+    """Serve the web app on the running event loop"""
     port = int(os.environ.get('PORT', 8080))
-    logger.info(f"🌐 Flask server starting on port {port}")
-    
-    # Disable Flask's default logging
-    werkzeug_log = logging.getLogger('werkzeug')
-    werkzeug_log.setLevel(logging.WARNING)
-    
-    # Run in production mode
-    from waitress import serve
-    serve(app, host='0.0.0.0', port=port)
-
-def keep_alive():
-    """Start both Flask server and self-pinger"""
-    
-    # Start Flask server in a thread
-    flask_thread = Thread(target=run_flask, daemon=True)
-    flask_thread.start()
-    logger.info("✅ Flask server started")
-    
-    # Wait a moment for server to start
-    time.sleep(2)
-    
+    logger.info(f"🌐 Web server starting on port {port}")
+    await runner.setup()
+    site = web.TCPSite(runner, host='0.0.0.0', port=port)
+    await site.start()
+
+async def keep_alive(health=None, metrics=None):
+    """Start both the web server and self-pinger on the current event loop
+
+    health is a () -> (ready, details) callable behind /health; metrics is the registry behind /metrics.
+    """
+    global health_check, metrics_registry
+    health_check = health
+    metrics_registry = metrics
+
+    # The port is bound once this returns, so the pinger can start right away
+    try:
+        await run_server()
+    except OSError as e:
+        # e.g. the port is already in use; the bot still runs, just without the web endpoints
+        logger.error(f"❌ Web server failed to start: {e}")
+        await runner.cleanup()
+        return False
+    logger.info("✅ Web server started")
+
     # Start self-pinger
     pinger.start()
-    
+
     # Log the URL for testing
     url = pinger.get_own_url()
     logger.info(f"📡 Server URL: {url}")
     logger.info("🎯 Keep-alive system fully active")
     logger.info("⏰ Will auto-ping every 5 minutes")
-    
+
     return True
+
+async def stop_keep_alive():
+    """Stop the pinger and close the web server"""
+    await pinger.stop()
+    await runner.cleanup()
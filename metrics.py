@@ -0,0 +1,109 @@
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic count, optionally split by one label. inc() is a dict update, cheap enough for every event"""
+
+    __slots__ = ("name", "help", "label", "values")
+
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values = {}  # label value (None without a label) -> count
+
+    def inc(self, key=None, amount=1):
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        if not self.values and self.label is None:
+            return [(self.name, None, 0)]
+        return [(self.name, key, value) for key, value in sorted(self.values.items(), key=lambda item: str(item[0]))]
+
+
+class Gauge:
+    """Value read from a callback at scrape time; the callback may return {label value: value}"""
+
+    __slots__ = ("name", "help", "label", "read")
+
+    def __init__(self, name, help, read, label=None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.read = read
+
+    def samples(self):
+        value = self.read()
+        if self.label is None:
+            return [(self.name, None, value)]
+        return [(self.name, key, item) for key, item in value.items()]
+
+
+class Summary:
+    """Count and sum of observations (e.g. durations) read from a callback returning (count, sum)"""
+
+    __slots__ = ("name", "help", "label", "read")
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.label = None
+        self.read = read
+
+    def samples(self):
+        count, total = self.read()
+        return [(f"{self.name}_count", None, count), (f"{self.name}_sum", None, total)]
+
+
+class MetricsRegistry:
+    """Metrics rendered in the Prometheus text exposition format"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, label=None):
+        return self._add(Counter(name, help, label))
+
+    def gauge(self, name, help, read, label=None):
+        return self._add(Gauge(name, help, read, label))
+
+    def summary(self, name, help, read):
+        return self._add(Summary(name, help, read))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                logger.warning(f"⚠️  Could not read metric {metric.name}: {e}")
+                continue
+            kind = type(metric).__name__.lower()
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for name, key, value in samples:
+                labels = f'{{{metric.label}="{_escape(key)}"}}' if metric.label else ""
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MODLOG_DB = os.environ.get("MODLOG_DB", "modlog.db")
+MODLOG_ACTIONS = ("warn", "clearwarns", "kick", "ban")
+
+
+class ModLog:
+    """Append-only moderation audit log in SQLite.
+
+    Every query walks an index on (guild, [target|actor,] time) newest-first and
+    pages by (time, id) keyset, so a page costs the same however long the history is.
+    """
+
+    def __init__(self, path=MODLOG_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS mod_actions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                actor_id INTEGER NOT NULL,
+                target_id INTEGER NOT NULL,
+                reason TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mod_actions_target ON mod_actions (guild_id, target_id, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_mod_actions_actor ON mod_actions (guild_id, actor_id, created_at, id);
+            CREATE INDEX IF NOT EXISTS idx_mod_actions_time ON mod_actions (guild_id, created_at, id);
+            CREATE TRIGGER IF NOT EXISTS mod_actions_append_only_update BEFORE UPDATE ON mod_actions
+            BEGIN SELECT RAISE(ABORT, 'mod_actions is append-only'); END;
+            CREATE TRIGGER IF NOT EXISTS mod_actions_append_only_delete BEFORE DELETE ON mod_actions
+            BEGIN SELECT RAISE(ABORT, 'mod_actions is append-only'); END;
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _row_to_entry(row):
+        entry_id, guild_id, action, actor_id, target_id, reason, created_at = row
+        return {
+            "id": entry_id,
+            "guild_id": guild_id,
+            "action": action,
+            "actor_id": actor_id,
+            "target_id": target_id,
+            "reason": reason,
+            "timestamp": datetime.fromisoformat(created_at),
+        }
+
+    def record(self, guild_id, action, actor_id, target_ids, reason=None, timestamp=None):
+        """Append one entry per target (a mass warn is one call)"""
+        if isinstance(target_ids, int):
+            target_ids = [target_ids]
+        created_at = (timestamp or datetime.utcnow()).isoformat()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO mod_actions (guild_id, action, actor_id, target_id, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(guild_id, action, actor_id, target_id, reason, created_at) for target_id in target_ids]
+            )
+            self.conn.commit()
+
+    @staticmethod
+    def cursor(entry):
+        """Keyset cursor for the page after the one ending with entry"""
+        return (entry["timestamp"].isoformat(), entry["id"])
+
+    def query(self, guild_id, target_id=None, actor_id=None, since=None, until=None, before=None, limit=10):
+        """Newest-first entries matching the filters; pass cursor(last entry) as before for the next page"""
+        clauses = ["guild_id = ?"]
+        params = [guild_id]
+        if target_id is not None:
+            clauses.append("target_id = ?")
+            params.append(target_id)
+        if actor_id is not None:
+            clauses.append("actor_id = ?")
+            params.append(actor_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until.isoformat())
+        if before is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, guild_id, action, actor_id, target_id, reason, created_at FROM mod_actions "
+                f"WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
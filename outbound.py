@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, most important first
+MODERATION = 0
+REPLY = 1
+DM = 2
+PRIORITY_NAMES = ("moderation", "reply", "dm")
+
+OUTBOUND_CONCURRENCY = 8  # Sends in flight at once
+MAX_QUEUE_DEPTH = (500, 100, 200)  # Per priority class; further sends are dropped
+MAX_ROUTES = 5000  # Rate-limit states remembered
+
+_CHANNEL_PATH = re.compile(r"/channels/(\d+)/")
+
+
+class OutboundDropped(Exception):
+    """Raised when a send is refused because its priority class queue is full"""
+
+
+def channel_route(channel_id):
+    return f"channel:{channel_id}"
+
+
+def dm_route(dm_channel_id):
+    """DMs go to /channels/{dm channel id}/messages, so they share that channel's rate-limit state"""
+    return channel_route(dm_channel_id)
+
+
+class RouteLimits:
+    """Remaining requests and reset times per route, taken from Discord's rate-limit headers"""
+
+    def __init__(self, max_routes=MAX_ROUTES):
+        self.max_routes = max_routes
+        self._routes = {}  # route -> (remaining, reset at, monotonic)
+
+    def trace_config(self):
+        """aiohttp trace hook that records the headers of every Discord API response"""
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    async def _on_request_end(self, session, context, params):
+        match = _CHANNEL_PATH.search(params.url.path)
+        if not match:
+            return
+        headers = params.response.headers
+        try:
+            if params.response.status == 429:
+                self.update(channel_route(match.group(1)), 0, float(headers.get("Retry-After", 1)))
+            elif "X-RateLimit-Remaining" in headers:
+                self.update(
+                    channel_route(match.group(1)),
+                    int(headers["X-RateLimit-Remaining"]),
+                    float(headers.get("X-RateLimit-Reset-After", 0))
+                )
+        except ValueError:
+            pass  # Malformed header; discord.py's own limiter still applies
+
+    def update(self, route, remaining, reset_after):
+        now = time.monotonic()
+        if len(self._routes) >= self.max_routes:
+            self._routes = {key: value for key, value in self._routes.items() if value[1] > now}
+        self._routes[route] = (remaining, now + reset_after)
+
+    def delay(self, route):
+        """Seconds to wait before the route has requests left"""
+        state = self._routes.get(route)
+        if state is None:
+            return 0.0
+        remaining, reset_at = state
+        if remaining > 0:
+            return 0.0
+        return max(0.0, reset_at - time.monotonic())
+
+
+class OutboundScheduler:
+    """Central queue for outgoing messages.
+
+    Higher priority classes are dispatched first and each class has a bounded
+    queue. A send whose route is rate-limited is parked until its window reopens
+    instead of occupying a send slot, so it never delays sends to other routes.
+    """
+
+    def __init__(self, limits, concurrency=OUTBOUND_CONCURRENCY, max_depth=MAX_QUEUE_DEPTH):
+        self.limits = limits
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self._heap = []  # (priority, seq, queued at, route, factory, future), ready to go
+        self._parked = []  # (ready at, seq, job) for jobs waiting on their route's rate limit
+        self._seq = itertools.count()
+        self._depth = [0] * len(PRIORITY_NAMES)
+        self._wakeup = None
+        self._slots = None
+        self._task = None
+        self._running = set()  # Send tasks in flight, referenced until done
+        self.metrics = [
+            {"sent": 0, "failed": 0, "dropped": 0, "parked": 0, "latency_total": 0.0, "latency_max": 0.0}
+            for _ in PRIORITY_NAMES
+        ]
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def send(self, priority, route, factory):
+        """Queue factory() (a coroutine function doing the send) and return its result"""
+        if self._depth[priority] >= self.max_depth[priority]:
+            self.metrics[priority]["dropped"] += 1
+            raise OutboundDropped(f"{PRIORITY_NAMES[priority]} queue is full")
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), time.monotonic(), route, factory, future))
+        self._depth[priority] += 1
+        self._wakeup.set()
+        return await future
+
+    def _park(self, job, delay):
+        self.metrics[job[0]]["parked"] += 1
+        heapq.heappush(self._parked, (time.monotonic() + delay, job[1], job))
+
+    def _next_ready(self):
+        """Pop the highest-priority job whose route can send now, parking rate-limited ones.
+
+        Returns (job, None), or (None, seconds until a parked job is due / None if nothing is queued).
+        """
+        now = time.monotonic()
+        while self._parked and self._parked[0][0] <= now:
+            heapq.heappush(self._heap, heapq.heappop(self._parked)[2])
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            if job[5].done():
+                self._depth[job[0]] -= 1  # Caller gave up while queued
+                continue
+            delay = self.limits.delay(job[3])
+            if delay:
+                self._park(job, delay)
+                continue
+            self._depth[job[0]] -= 1
+            return job, None
+        return None, (self._parked[0][0] - now if self._parked else None)
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            while True:
+                job, wait = self._next_ready()
+                if job is not None:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass  # A parked job is due
+            task = asyncio.create_task(self._run(*job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, priority, seq, queued_at, route, factory, future):
+        metrics = self.metrics[priority]
+        try:
+            if future.done():
+                return  # Caller gave up while queued
+            delay = self.limits.delay(route)
+            if delay:
+                # Another send used up the window since this one was picked; wait without a slot
+                self._depth[priority] += 1
+                self._park((priority, seq, queued_at, route, factory, future), delay)
+                self._wakeup.set()
+                return
+            latency = time.monotonic() - queued_at
+            metrics["latency_total"] += latency
+            metrics["latency_max"] = max(metrics["latency_max"], latency)
+            try:
+                result = await factory()
+            except Exception as e:
+                metrics["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+                return
+            metrics["sent"] += 1
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        stats = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            metrics = self.metrics[priority]
+            started = metrics["sent"] + metrics["failed"]
+            stats[name] = {
+                "queued": self._depth[priority],
+                "sent": metrics["sent"],
+                "failed": metrics["failed"],
+                "dropped": metrics["dropped"],
+                "parked": metrics["parked"],
+                "avg_latency_ms": round(1000 * metrics["latency_total"] / started, 1) if started else 0.0,
+                "max_latency_ms": round(1000 * metrics["latency_max"], 1),
+            }
+        return stats
@@ -0,0 +1,157 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_SIZE = 2000  # Users fetched over REST kept around
+USER_TTL = 3600  # Seconds before a fetched user is refetched (names and avatars change)
+MISSING_USER_TTL = 600  # Seconds an id Discord doesn't know is remembered as missing
+CHANNEL_CACHE_SIZE = 1000  # Channels fetched over REST kept around
+CHANNEL_TTL = 600  # Seconds before a fetched channel is refetched (gateway events invalidate sooner)
+MISSING_CHANNEL_TTL = 60  # Seconds a missing or inaccessible channel id is remembered; short since access can be granted
+_MISSING = object()
+
+
+class CachedResolver:
+    """Resolve ids to Discord objects: gateway cache first, then a bounded TTL'd LRU, then one REST fetch.
+
+    Ids Discord doesn't know are cached as missing for a while too. Concurrent
+    lookups for the same id share a single fetch. Subclasses provide _get and _fetch_remote.
+    """
+
+    kind = "object"
+
+    def __init__(self, client, max_size, ttl, missing_ttl):
+        self.client = client
+        self.max_size = max_size
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self._entries = OrderedDict()  # id -> (object or _MISSING, expires at), least recently used first
+        self._inflight = {}  # id -> Future
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, object_id):
+        """The object from the gateway cache, or None"""
+        raise NotImplementedError
+
+    async def _fetch_remote(self, object_id):
+        """Fetch over REST; return _MISSING when Discord says it doesn't exist for us"""
+        raise NotImplementedError
+
+    def _lookup(self, object_id):
+        """Cached object, _MISSING for a known-missing id, or None if we have to ask Discord"""
+        obj = self._get(object_id)
+        if obj is not None:
+            return obj
+        entry = self._entries.get(object_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[object_id]
+            return None
+        self._entries.move_to_end(object_id)
+        return entry[0]
+
+    def cached(self, object_id):
+        obj = self._lookup(object_id)
+        return None if obj is _MISSING else obj
+
+    def _store(self, object_id, obj):
+        ttl = self.missing_ttl if obj is _MISSING else self.ttl
+        self._entries[object_id] = (obj, time.monotonic() + ttl)
+        self._entries.move_to_end(object_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, object_id):
+        """Forget whatever is cached for an id, e.g. after a gateway event about it"""
+        self._entries.pop(object_id, None)
+
+    async def _fetch(self, object_id):
+        try:
+            obj = await self._fetch_remote(object_id)
+        except discord.HTTPException as e:
+            logger.warning(f"⚠️  Could not fetch {self.kind} {object_id}: {e}")
+            return None  # Transient; don't remember it
+        self._store(object_id, obj)
+        return obj
+
+    async def resolve(self, object_id):
+        """The object with this id, or None if Discord doesn't know it"""
+        obj = self._lookup(object_id)
+        if obj is _MISSING:
+            self.negative_hits += 1
+            return None
+        if obj is not None:
+            self.hits += 1
+            return obj
+        self.misses += 1
+        future = self._inflight.get(object_id)
+        if future is None:
+            future = self._inflight[object_id] = asyncio.ensure_future(self._fetch(object_id))
+            future.add_done_callback(lambda _: self._inflight.pop(object_id, None))
+        obj = await asyncio.shield(future)
+        return None if obj is _MISSING else obj
+
+    async def resolve_many(self, object_ids):
+        """Resolve a batch of ids concurrently, each distinct id once. Returns {id: object or None}"""
+        unique = list(dict.fromkeys(object_ids))
+        objects = await asyncio.gather(*(self.resolve(object_id) for object_id in unique))
+        return dict(zip(unique, objects))
+
+    def stats(self):
+        return {
+            "cached": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+        }
+
+
+class UserResolver(CachedResolver):
+    """Users missing from the gateway cache, fetched on demand"""
+
+    kind = "user"
+
+    def __init__(self, client, max_size=USER_CACHE_SIZE, ttl=USER_TTL, missing_ttl=MISSING_USER_TTL):
+        super().__init__(client, max_size, ttl, missing_ttl)
+
+    def _get(self, user_id):
+        return self.client.get_user(user_id)
+
+    async def _fetch_remote(self, user_id):
+        try:
+            return await self.client.fetch_user(user_id)
+        except discord.NotFound:
+            return _MISSING
+
+
+class ChannelResolver(CachedResolver):
+    """Channels by id for any command that takes one.
+
+    Mistyped ids and channels the bot can't see are remembered briefly, so
+    repeating them doesn't cost a REST round trip each time.
+    """
+
+    kind = "channel"
+
+    def __init__(self, client, max_size=CHANNEL_CACHE_SIZE, ttl=CHANNEL_TTL, missing_ttl=MISSING_CHANNEL_TTL):
+        super().__init__(client, max_size, ttl, missing_ttl)
+
+    def _get(self, channel_id):
+        return self.client.get_channel(channel_id)
+
+    async def _fetch_remote(self, channel_id):
+        try:
+            return await self.client.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden, discord.InvalidData):
+            return _MISSING
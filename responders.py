@@ -0,0 +1,260 @@
+import json
+import os
+import time
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+RESPONDERS_FILE = os.environ.get("RESPONDERS_FILE", "responders.json")
+USER_COOLDOWN = float(os.environ.get("RESPONDER_USER_COOLDOWN", 30))  # Seconds per reply token, per user
+USER_BURST = int(os.environ.get("RESPONDER_USER_BURST", 2))
+CHANNEL_COOLDOWN = float(os.environ.get("RESPONDER_CHANNEL_COOLDOWN", 5))  # Seconds per reply token, per channel
+CHANNEL_BURST = int(os.environ.get("RESPONDER_CHANNEL_BURST", 3))
+MAX_BUCKETS = 10000  # Per table; idle buckets are forgotten long before this
+MAX_COALESCED = 25  # Users mentioned in one coalesced reply
+
+
+class AhoCorasick:
+    """Multi-keyword automaton; one pass over the text finds every keyword at once.
+
+    Each keyword carries an integer value and search() returns the lowest value found.
+    """
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]  # Lowest value of any keyword ending at this node
+        for keyword, value in keywords:
+            node = 0
+            for char in keyword:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                node = nxt
+            self._best[node] = _lowest(self._best[node], value)
+
+        # Breadth-first so every fail link points at an already finished node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._best[nxt] = _lowest(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+    def search(self, text):
+        """Lowest value of any keyword contained in text, or None"""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = None
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if best[node] is not None:
+                found = _lowest(found, best[node])
+                if found == 0:
+                    break  # Nothing can beat the first rule
+        return found
+
+
+def _lowest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class ResponderRule:
+    """One auto-response: trigger keywords, the channels it listens in and the embed it sends"""
+
+    __slots__ = ('name', 'keywords', 'channels', 'title', 'description', 'color', 'emoji')
+
+    def __init__(self, name, keywords, channels=(), title="", description="", color="blue", emoji="📨"):
+        self.name = name
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.channels = [int(channel_id) for channel_id in channels]  # Empty = every channel
+        self.title = title
+        self.description = description
+        self.color = color
+        self.emoji = emoji
+
+
+class ResponderEngine:
+    """Per-channel automata over the configured rules.
+
+    Earlier rules win when a message matches several, like an if/elif chain.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        global_rules = [i for i, rule in enumerate(self.rules) if not rule.channels]
+        channel_rules = {}
+        for i, rule in enumerate(self.rules):
+            for channel_id in rule.channels:
+                channel_rules.setdefault(channel_id, []).append(i)
+
+        self._default = self._compile(global_rules)
+        self._channels = {
+            channel_id: self._compile(sorted(set(indexes) | set(global_rules)))
+            for channel_id, indexes in channel_rules.items()
+        }
+
+    def _compile(self, indexes):
+        if not indexes:
+            return None
+        return AhoCorasick(
+            (keyword, i) for i in indexes for keyword in self.rules[i].keywords if keyword
+        )
+
+    @property
+    def channel_ids(self):
+        return list(self._channels)
+
+    def match(self, channel_id, content):
+        """The rule a message triggers, or None"""
+        automaton = self._channels.get(channel_id, self._default)
+        if automaton is None or not content:
+            return None
+        found = automaton.search(content.lower())
+        return None if found is None else self.rules[found]
+
+
+class TokenBuckets:
+    """Token buckets keyed by id, in a bounded LRU.
+
+    A bucket idle long enough to be full again is the same as no bucket, so those are dropped.
+    """
+
+    def __init__(self, cooldown, burst, max_keys=MAX_BUCKETS):
+        self.cooldown = cooldown  # Seconds to regain one token
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, last update], least recently used first
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _tokens(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.burst
+        return min(self.burst, bucket[0] + (now - bucket[1]) / self.cooldown)
+
+    def _expire(self, now):
+        while self._buckets:
+            key = next(iter(self._buckets))
+            if self._tokens(key, now) < self.burst and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def take(self, key, now=None, force=False):
+        """Spend a token; with force the bucket may go into debt. Returns whether one was available"""
+        now = time.monotonic() if now is None else now
+        tokens = self._tokens(key, now)
+        available = tokens >= 1
+        if available or force:
+            self._buckets[key] = [tokens - 1, now]
+            self._buckets.move_to_end(key)
+            self._expire(now)
+        return available
+
+    def wait(self, key, now=None):
+        """Seconds until the bucket has a token again"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, (1 - self._tokens(key, now)) * self.cooldown)
+
+
+class ResponseThrottle:
+    """Per-user and per-channel cooldowns for auto-responses.
+
+    Matches that land while a channel is cooling down are coalesced into one
+    later reply per (channel, rule) that mentions every triggering user.
+    """
+
+    def __init__(self, user_cooldown=USER_COOLDOWN, user_burst=USER_BURST,
+                 channel_cooldown=CHANNEL_COOLDOWN, channel_burst=CHANNEL_BURST):
+        self.users = TokenBuckets(user_cooldown, user_burst)
+        self.channels = TokenBuckets(channel_cooldown, channel_burst)
+        self._pending = {}  # (channel_id, rule name) -> {user_id: (name, avatar_url)}
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def submit(self, channel_id, rule_name, user_id, name, avatar_url=None):
+        """Decide what to do with a match.
+
+        Returns 0 to reply now, a delay in seconds after which flush() must be
+        called for a newly started batch, or None when there is nothing to do.
+        """
+        if not self.users.take(user_id):
+            self.dropped += 1
+            return None
+        key = (channel_id, rule_name)
+        batch = self._pending.get(key)
+        if batch is not None:
+            if len(batch) < MAX_COALESCED:
+                batch.setdefault(user_id, (name, avatar_url))
+            self.coalesced += 1
+            return None
+        if self.channels.take(channel_id):
+            self.sent += 1
+            return 0
+        self._pending[key] = {user_id: (name, avatar_url)}
+        self.coalesced += 1
+        return self.channels.wait(channel_id)
+
+    def flush(self, channel_id, rule_name):
+        """Take a batch's users as [(user_id, name, avatar_url)] once its delay has passed"""
+        batch = self._pending.pop((channel_id, rule_name), {})
+        if batch:
+            self.channels.take(channel_id, force=True)
+            self.sent += 1
+        return [(user_id, name, avatar_url) for user_id, (name, avatar_url) in batch.items()]
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "user_buckets": len(self.users),
+            "channel_buckets": len(self.channels),
+        }
+
+
+def load_responders(path=RESPONDERS_FILE):
+    """Build the responder engine from the rules file.
+
+    No file or an unreadable one means no responders; a bad rule is logged and skipped.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"⚠️  {path} not found, auto-responders disabled")
+        return ResponderEngine([])
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logger.error(f"❌ {path} is not valid JSON, auto-responders disabled: {e}")
+        return ResponderEngine([])
+    if not isinstance(data, dict) or not isinstance(data.get("rules", []), list):
+        logger.error(f"❌ {path} must be an object with a \"rules\" list, auto-responders disabled")
+        return ResponderEngine([])
+    rules = []
+    for i, rule in enumerate(data.get("rules", [])):
+        try:
+            rules.append(ResponderRule(**rule))
+        except (TypeError, ValueError, AttributeError) as e:
+            name = rule.get("name", f"#{i + 1}") if isinstance(rule, dict) else f"#{i + 1}"
+            logger.error(f"❌ Skipping responder rule {name} in {path}: {e}")
+    logger.info(f"✅ Loaded {len(rules)} responder rule(s) from {path}")
+    return ResponderEngine(rules)
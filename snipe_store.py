@@ -0,0 +1,445 @@
+import os
+import mmap
+import struct
+import zlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+SNIPES_DIR = os.environ.get("SNIPES_DIR", "snipes")  # One ring file per channel group
+SNIPE_GROUPS = int(os.environ.get("SNIPE_GROUPS", 16))
+SNIPE_GROUP_SLOTS = int(os.environ.get("SNIPE_GROUP_SLOTS", 128))  # Deletions kept on disk per group
+SNIPE_SLOT_SIZE = 4096  # Content is truncated to fit one slot
+SNIPE_MAX_BYTES = int(os.environ.get("SNIPE_MAX_BYTES", 4 * 1024 * 1024))
+SNIPE_TTL = int(os.environ.get("SNIPE_TTL", 6 * 3600))  # Seconds a deletion stays snipeable
+RECORD_OVERHEAD = 256  # Rough per-record cost of the object, slots and tuple
+
+
+class SnipeRecord:
+    """A deleted message, reduced to the fields the snipe embed renders.
+
+    Holds ids and strings only, never discord.py Member/Message objects.
+    """
+
+    __slots__ = ('author_id', 'author_name', 'avatar_url', 'content', 'timestamp', 'attachments', 'nbytes')
+
+    def __init__(self, author_id, author_name, avatar_url, content, timestamp, attachments=()):
+        self.author_id = author_id
+        self.author_name = author_name
+        self.avatar_url = avatar_url
+        self.content = content
+        self.timestamp = timestamp
+        self.attachments = tuple(attachments)
+        self.nbytes = RECORD_OVERHEAD + sum(
+            len(text.encode()) for text in (author_name, avatar_url, content, *self.attachments)
+        )
+
+    @classmethod
+    def from_message(cls, message):
+        """Build a record from a deleted discord.Message"""
+        return cls(
+            author_id=message.author.id,
+            author_name=str(message.author),
+            avatar_url=message.author.display_avatar.url,
+            content=message.content,
+            timestamp=datetime.utcnow(),
+            attachments=[att.url for att in message.attachments]
+        )
+
+
+class SnipeRing:
+    """Fixed-capacity ring buffer of a channel's most recent deletions"""
+
+    __slots__ = ('_slots', '_head', '_size', 'nbytes')
+
+    def __init__(self, capacity):
+        self._slots = [None] * capacity
+        self._head = 0  # Next slot to write
+        self._size = 0
+        self.nbytes = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._slots)
+
+    def push(self, record):
+        """Add a record, overwriting the oldest once full"""
+        overwritten = self._slots[self._head]
+        if overwritten is not None:
+            self.nbytes -= overwritten.nbytes
+        self._slots[self._head] = record
+        self.nbytes += record.nbytes
+        self._head = (self._head + 1) % len(self._slots)
+        self._size = min(self._size + 1, len(self._slots))
+
+    def recent(self, number=1):
+        """Return the nth most recent record (1 = most recent)"""
+        if not 1 <= number <= self._size:
+            raise IndexError(number)
+        return self._slots[(self._head - number) % len(self._slots)]
+
+    def __iter__(self):
+        """Iterate from most to least recent"""
+        for number in range(1, self._size + 1):
+            yield self.recent(number)
+
+    def expire(self, cutoff):
+        """Drop records older than cutoff, oldest first. Returns how many were dropped"""
+        dropped = 0
+        while self._size:
+            oldest = (self._head - self._size) % len(self._slots)
+            record = self._slots[oldest]
+            if record.timestamp >= cutoff:
+                break
+            self._slots[oldest] = None
+            self.nbytes -= record.nbytes
+            self._size -= 1
+            dropped += 1
+        return dropped
+
+    def clear(self):
+        self._slots = [None] * len(self._slots)
+        self._head = 0
+        self._size = 0
+        self.nbytes = 0
+
+
+# ===== RING FILES =====
+# File: header, then fixed-size slots. Slot: crc32, payload length, seq, channel_id,
+# author_id, timestamp (epoch microseconds), then the length-prefixed strings.
+# seq 0 marks an empty slot; the crc is written last so a torn slot is skipped on load.
+RING_MAGIC = b"SRNG"
+RING_VERSION = 1
+_RING_HEADER = struct.Struct("<4sHII")
+_RING_HEADER_SIZE = 64
+_SLOT = struct.Struct("<IIQQQq")
+_STRING = struct.Struct("<H")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _truncate(text, limit):
+    """Encode text, cutting it to at most limit bytes on a character boundary"""
+    data = text.encode()
+    if len(data) <= limit:
+        return data
+    return data[:limit].decode(errors="ignore").encode()
+
+
+def pack_slot(seq, channel_id, record, slot_size):
+    """Serialise a record into one slot"""
+    fixed = [
+        _truncate(record.author_name, 256),
+        _truncate(record.avatar_url, 512),
+        _truncate("\n".join(record.attachments), 1024),
+    ]
+    room = slot_size - _SLOT.size - 4 * _STRING.size - sum(len(part) for part in fixed)
+    parts = fixed[:2] + [_truncate(record.content, room), fixed[2]]
+    payload = b"".join(_STRING.pack(len(part)) + part for part in parts)
+    timestamp = (record.timestamp - _EPOCH) // timedelta(microseconds=1)
+    header = _SLOT.pack(0, len(payload), seq, channel_id, record.author_id, timestamp)
+    crc = zlib.crc32(header[4:] + payload)
+    return _SLOT.pack(crc, len(payload), seq, channel_id, record.author_id, timestamp) + payload
+
+
+class SnipeRingFile:
+    """One channel group's memory-mapped ring of recent deletions"""
+
+    def __init__(self, path, slots=SNIPE_GROUP_SLOTS, slot_size=SNIPE_SLOT_SIZE):
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_RING_HEADER.pack(RING_MAGIC, RING_VERSION, slot_size, slots))
+                f.truncate(_RING_HEADER_SIZE + slots * slot_size)
+        self._file = open(path, "r+b")
+        self.buffer = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.slot_size, self.slots = _RING_HEADER.unpack_from(self.buffer, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a snipe ring file")
+        
+        # Only slot headers are read here; records are decoded when their channel is asked for
+        self.owners = [0] * self.slots  # slot -> channel_id
+        self.channels = {}  # channel_id -> [slot, ...] oldest first
+        newest = (0, -1)
+        for slot in range(self.slots):
+            _, _, seq, channel_id, _, _ = _SLOT.unpack_from(self.buffer, self._offset(slot))
+            if seq:
+                self.owners[slot] = channel_id
+                newest = max(newest, (seq, slot))
+        self.seq, last = newest
+        self.head = (last + 1) % self.slots
+        for slot in sorted(
+            (slot for slot in range(self.slots) if self.owners[slot]),
+            key=lambda slot: _SLOT.unpack_from(self.buffer, self._offset(slot))[2]
+        ):
+            self.channels.setdefault(self.owners[slot], []).append(slot)
+
+    def _offset(self, slot):
+        return _RING_HEADER_SIZE + slot * self.slot_size
+
+    def _release(self, slot):
+        channel_id = self.owners[slot]
+        if not channel_id:
+            return
+        owned = self.channels[channel_id]
+        owned.remove(slot)
+        if not owned:
+            del self.channels[channel_id]
+        self.owners[slot] = 0
+
+    def append(self, channel_id, record):
+        """Write a record into the next slot, overwriting the group's oldest"""
+        slot = self.head
+        self._release(slot)
+        self.seq += 1
+        data = pack_slot(self.seq, channel_id, record, self.slot_size)
+        offset = self._offset(slot)
+        self.buffer[offset + 4:offset + len(data)] = data[4:]
+        self.buffer[offset:offset + 4] = data[:4]  # crc last
+        self.owners[slot] = channel_id
+        self.channels.setdefault(channel_id, []).append(slot)
+        self.head = (slot + 1) % self.slots
+
+    def _decode(self, slot):
+        offset = self._offset(slot)
+        crc, length, _, _, author_id, timestamp = _SLOT.unpack_from(self.buffer, offset)
+        if _SLOT.size + length > self.slot_size:
+            return None
+        body = self.buffer[offset + 4:offset + _SLOT.size + length]
+        if zlib.crc32(body) != crc:
+            return None
+        pos = offset + _SLOT.size
+        parts = []
+        for _ in range(4):
+            size, = _STRING.unpack_from(self.buffer, pos)
+            pos += _STRING.size
+            parts.append(self.buffer[pos:pos + size].decode(errors="replace"))
+            pos += size
+        author_name, avatar_url, content, attachments = parts
+        return SnipeRecord(
+            author_id, author_name, avatar_url, content,
+            _EPOCH + timedelta(microseconds=timestamp),
+            attachments.split("\n") if attachments else ()
+        )
+
+    def load(self, channel_id):
+        """Decode a channel's records, oldest first, skipping torn slots"""
+        records = []
+        for slot in self.channels.get(channel_id, ()):
+            record = self._decode(slot)
+            if record is None:
+                logger.warning(f"⚠️  Skipping torn snipe slot {slot}")
+                continue
+            records.append(record)
+        return records
+
+    def clear(self, channel_id):
+        for slot in list(self.channels.get(channel_id, ())):
+            offset = self._offset(slot)
+            self.buffer[offset:offset + _SLOT.size] = bytes(_SLOT.size)
+            self._release(slot)
+
+    def flush(self):
+        self.buffer.flush()
+
+    def close(self):
+        if not self.buffer.closed:
+            self.buffer.close()
+        self._file.close()
+
+
+class SnipeFileStore:
+    """Write-through persistence for snipes, one ring file per channel group.
+
+    Group files are opened on first use, so startup cost does not grow with history.
+    """
+
+    def __init__(self, directory=SNIPES_DIR, groups=SNIPE_GROUPS):
+        self.directory = directory
+        self.groups = groups
+        self._files = {}  # group -> SnipeRingFile
+
+    def _group(self, channel_id):
+        group = channel_id % self.groups
+        ring_file = self._files.get(group)
+        if ring_file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{group}.ring")
+            try:
+                ring_file = SnipeRingFile(path)
+            except (ValueError, OSError, struct.error) as e:
+                logger.error(f"❌ Resetting unreadable snipe ring {path}: {e}")
+                os.replace(path, path + ".corrupt")
+                ring_file = SnipeRingFile(path)
+            self._files[group] = ring_file
+        return ring_file
+
+    def append(self, channel_id, record):
+        self._group(channel_id).append(channel_id, record)
+
+    def load(self, channel_id):
+        return self._group(channel_id).load(channel_id)
+
+    def clear(self, channel_id):
+        self._group(channel_id).clear(channel_id)
+
+    def flush(self):
+        for ring_file in self._files.values():
+            ring_file.flush()
+
+    def close(self):
+        for ring_file in self._files.values():
+            ring_file.flush()
+            ring_file.close()
+        self._files.clear()
+
+
+class SnipeCache:
+    """Per-channel snipe rings under one byte budget, with TTL and LRU eviction.
+
+    Reads never create entries; only push() does.
+    """
+
+    def __init__(self, per_channel, max_bytes=SNIPE_MAX_BYTES, ttl=SNIPE_TTL, store=None):
+        self.per_channel = per_channel
+        self.store = store  # Optional SnipeFileStore written through on every push
+        self.max_bytes = max_bytes
+        self.ttl = timedelta(seconds=ttl)
+        self._rings = OrderedDict()  # channel_id -> SnipeRing, least recently used first
+        self._embeds = {}  # channel_id -> {(number, index): rendered embed}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.embed_hits = 0
+        self.embed_misses = 0
+
+    def __len__(self):
+        return len(self._rings)
+
+    def _cutoff(self):
+        return datetime.utcnow() - self.ttl
+
+    def _expire(self, channel_id, ring, cutoff):
+        before = ring.nbytes
+        dropped = ring.expire(cutoff)
+        if not dropped:
+            return
+        self.expirations += dropped
+        self.nbytes -= before - ring.nbytes
+        self._embeds.pop(channel_id, None)
+        if not ring:
+            del self._rings[channel_id]
+
+    def _load(self, channel_id):
+        """Rebuild a channel's ring from disk, or None if nothing live is stored"""
+        if self.store is None:
+            return None
+        cutoff = self._cutoff()
+        records = [record for record in self.store.load(channel_id) if record.timestamp >= cutoff]
+        if not records:
+            return None
+        ring = self._rings[channel_id] = SnipeRing(self.per_channel)
+        for record in records[-self.per_channel:]:
+            ring.push(record)
+        self.nbytes += ring.nbytes
+        self._enforce_budget()
+        return self._rings.get(channel_id)
+
+    def push(self, channel_id, record):
+        """Store a deletion and evict idle channels until back under budget"""
+        ring = self._rings.get(channel_id)
+        if ring is None:
+            ring = self._load(channel_id)
+        if ring is None:
+            ring = self._rings[channel_id] = SnipeRing(self.per_channel)
+        else:
+            self._rings.move_to_end(channel_id)
+        before = ring.nbytes
+        ring.push(record)
+        self.nbytes += ring.nbytes - before
+        self._embeds.pop(channel_id, None)  # Every slot now shows a different message
+        if self.store is not None:
+            self.store.append(channel_id, record)
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        while self.nbytes > self.max_bytes and len(self._rings) > 1:
+            channel_id, evicted = self._rings.popitem(last=False)
+            self._embeds.pop(channel_id, None)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get(self, channel_id):
+        """Return the channel's live ring, or None if it has no snipes"""
+        ring = self._rings.get(channel_id)
+        if ring is not None:
+            self._expire(channel_id, ring, self._cutoff())
+            ring = self._rings.get(channel_id)
+        else:
+            ring = self._load(channel_id)
+        if ring is None:
+            self.misses += 1
+            return None
+        self._rings.move_to_end(channel_id)
+        self.hits += 1
+        return ring
+
+    def clear(self, channel_id):
+        """Forget a channel's snipes. Returns how many were removed"""
+        ring = self._rings.get(channel_id)
+        if ring is None:
+            ring = self._load(channel_id)
+        if self.store is not None:
+            self.store.clear(channel_id)
+        if ring is None:
+            return 0
+        del self._rings[channel_id]
+        self._embeds.pop(channel_id, None)
+        self.nbytes -= ring.nbytes
+        return len(ring)
+
+    def embed(self, channel_id, number, index, render):
+        """Rendered embed for the nth most recent snipe, built once until the channel changes.
+
+        Call after get() has returned the channel's ring; render(record, index) builds the embed.
+        """
+        rendered = self._embeds.setdefault(channel_id, {})
+        key = (number, index)
+        if key in rendered:
+            self.embed_hits += 1
+            return rendered[key]
+        self.embed_misses += 1
+        embed = rendered[key] = render(self._rings[channel_id].recent(number), index)
+        return embed
+
+    def sweep(self):
+        """Expire old records in every channel and drop channels left empty"""
+        cutoff = self._cutoff()
+        before = self.expirations
+        for channel_id, ring in list(self._rings.items()):
+            self._expire(channel_id, ring, cutoff)
+        return self.expirations - before
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self):
+        return {
+            "channels": len(self._rings),
+            "records": sum(len(ring) for ring in self._rings.values()),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "embed_hits": self.embed_hits,
+            "embed_misses": self.embed_misses,
+        }
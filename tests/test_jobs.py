@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import jobs
+from jobs import JobQueue
+
+
+def test_torn_journal_tail_is_truncated_before_appending(tmp_path):
+    path = str(tmp_path / "jobs.journal")
+    queue = JobQueue(path)
+    queue.enqueue("dm", {"n": 1})
+    queue.enqueue("dm", {"n": 2})
+    queue.close()
+    with open(path, "a") as f:
+        f.write('{"op": "done", "id"')  # Crash mid-append
+
+    queue = JobQueue(path)
+    assert sorted(queue._pending) == [1, 2]
+    queue.enqueue("dm", {"n": 3})
+    queue.enqueue("dm", {"n": 4})
+    queue.close()
+
+    queue = JobQueue(path)
+    assert sorted(queue._pending) == [1, 2, 3, 4]
+    assert queue.next_id == 5
+    queue.close()
+
+
+def test_writes_are_batched_and_jobs_run_after_their_record(tmp_path):
+    path = str(tmp_path / "jobs.journal")
+    handled = []
+
+    async def scenario():
+        queue = JobQueue(path, workers=3)
+
+        async def handler(payload):
+            with open(path) as f:
+                journaled = [json.loads(line) for line in f]
+            assert {"op": "add", "id": payload["id"], "job": {"kind": "dm", "payload": payload, "attempts": 0}} in journaled
+            handled.append(payload["id"])
+
+        queue.register("dm", handler)
+        queue.start()
+        for i in range(1, 51):
+            queue.enqueue("dm", {"id": i})
+        while len(handled) < 50 or queue._unwritten:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        stats = queue.stats()
+        queue.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert sorted(handled) == list(range(1, 51))
+    assert stats["succeeded"] == 50 and stats["pending"] == 0
+    assert stats["journal_writes"] < 20  # 100 records group-committed, not one fsync each
+    assert JobQueue(path)._pending == {}
+
+
+def test_compaction_keeps_only_pending_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "COMPACT_EVERY", 3)
+    path = str(tmp_path / "jobs.journal")
+
+    async def scenario():
+        queue = JobQueue(path)
+
+        async def handler(payload):
+            if payload["keep"]:
+                raise RuntimeError("retry later")
+
+        queue.register("dm", handler)
+        queue.start()
+        queue.enqueue("dm", {"keep": True})
+        queue.enqueue("dm", {"keep": True})
+        for _ in range(4):
+            queue.enqueue("dm", {"keep": False})
+        while queue.succeeded < 4 or queue.retried < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        queue.close()
+
+    asyncio.run(scenario())
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) < 10
+    queue = JobQueue(path)
+    assert sorted(queue._pending) == [1, 2]
+    assert all(job["attempts"] == 1 for job in queue._pending.values())
+    queue.close()
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from yarl import URL
+
+from outbound import MODERATION, REPLY, OutboundScheduler, RouteLimits, dm_route
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_rate_limited_route_does_not_hold_send_slots():
+    async def scenario():
+        limits = RouteLimits()
+        limits.update("channel:1", 0, 0.5)  # Congested channel
+        scheduler = OutboundScheduler(limits, concurrency=2)
+        sent = []
+
+        def sender(name):
+            async def send():
+                sent.append((name, time.monotonic()))
+                return name
+            return send
+
+        started = time.monotonic()
+        replies = [asyncio.create_task(scheduler.send(REPLY, "channel:1", sender(f"reply{i}"))) for i in range(5)]
+        await asyncio.sleep(0.05)
+        assert await scheduler.send(MODERATION, "channel:2", sender("moderation")) == "moderation"
+        moderation_latency = time.monotonic() - started
+
+        assert await asyncio.gather(*replies) == [f"reply{i}" for i in range(5)]
+        return moderation_latency, sent, started, scheduler.stats()
+
+    moderation_latency, sent, started, stats = run(scenario())
+    assert moderation_latency < 0.2
+    assert sent[0][0] == "moderation"
+    assert all(at - started >= 0.45 for name, at in sent if name.startswith("reply"))
+    assert stats["reply"]["sent"] == 5 and stats["reply"]["queued"] == 0
+    assert stats["reply"]["parked"] == 5
+
+
+def test_higher_priority_goes_first_when_slots_are_busy():
+    async def scenario():
+        scheduler = OutboundScheduler(RouteLimits(), concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        def sender(name):
+            async def send():
+                order.append(name)
+            return send
+
+        first = asyncio.create_task(scheduler.send(REPLY, "channel:1", blocker))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(scheduler.send(REPLY, "channel:1", sender("reply"))),
+            asyncio.create_task(scheduler.send(MODERATION, "channel:2", sender("moderation"))),
+        ]
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(first, *queued)
+        return order
+
+    assert run(scenario()) == ["moderation", "reply"]
+
+
+def test_dm_route_follows_dm_channel_rate_limit_headers():
+    class Params:
+        url = URL("https://discord.com/api/v10/channels/555/messages")
+        response = type("Response", (), {"status": 200, "headers": {
+            "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2.5"
+        }})()
+
+    limits = RouteLimits()
+    run(limits._on_request_end(None, None, Params()))
+    assert limits.delay(dm_route(555)) > 2
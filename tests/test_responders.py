@@ -0,0 +1,27 @@
+import json
+
+from responders import load_responders
+
+
+def write_rules(tmp_path, content):
+    path = tmp_path / "responders.json"
+    path.write_text(content if isinstance(content, str) else json.dumps(content))
+    return str(path)
+
+
+def test_malformed_file_disables_responders(tmp_path):
+    engine = load_responders(write_rules(tmp_path, '{"rules": [{"name": "script",'))
+    assert engine.rules == []
+    assert engine.match(1, "script please") is None
+
+
+def test_bad_rules_are_skipped(tmp_path):
+    path = write_rules(tmp_path, {"rules": [
+        {"name": "typo", "keywords": ["key"], "colour": "red"},
+        {"name": "channels", "keywords": ["x"], "channels": ["general"]},
+        "not a rule",
+        {"name": "script", "keywords": ["script"], "title": "Script"},
+    ]})
+    engine = load_responders(path)
+    assert [rule.name for rule in engine.rules] == ["script"]
+    assert engine.match(1, "need the SCRIPT").name == "script"
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime
+
+from snipe_store import SnipeFileStore, SnipeRecord, SnipeRingFile, _SLOT, _RING_HEADER_SIZE
+
+
+def record(content, second=0):
+    return SnipeRecord(1, "user#0001", "https://cdn/avatar.png", content, datetime(2024, 5, 1, 12, 0, second), ["https://cdn/a.png"])
+
+
+def fields(snipe):
+    return (snipe.author_id, snipe.author_name, snipe.avatar_url, snipe.content, snipe.timestamp, snipe.attachments)
+
+
+def test_ring_round_trip_and_wrap(tmp_path):
+    path = str(tmp_path / "0.ring")
+    ring = SnipeRingFile(path, slots=4, slot_size=512)
+    for i in range(6):
+        ring.append(100 + i % 2, record(f"message {i}", i))
+    ring.append(100, record("x" * 2000, 9))  # Truncated to fit the slot
+    ring.close()
+
+    ring = SnipeRingFile(path, slots=4, slot_size=512)
+    assert [s.content for s in ring.load(101)] == ["message 3", "message 5"]
+    loaded = ring.load(100)
+    assert [s.content[:9] for s in loaded] == ["message 4", "xxxxxxxxx"]
+    assert fields(loaded[0]) == fields(record("message 4", 4))
+    assert len(loaded[1].content.encode()) < 512
+    ring.append(100, record("after reopen"))  # Continues from the newest slot
+    assert ring.load(100)[-1].content == "after reopen"
+    ring.close()
+
+
+def test_ring_skips_bad_crc_and_torn_slots(tmp_path):
+    path = str(tmp_path / "0.ring")
+    ring = SnipeRingFile(path, slots=4, slot_size=512)
+    for i in range(3):
+        ring.append(100, record(f"message {i}", i))
+    slot_size = ring.slot_size
+    ring.close()
+
+    with open(path, "r+b") as f:
+        f.seek(_RING_HEADER_SIZE + 0 * slot_size + _SLOT.size + 5)
+        f.write(b"\xff")  # Corrupt the payload of the first slot
+        f.seek(_RING_HEADER_SIZE + 2 * slot_size)
+        f.write(b"\x00\x00\x00\x00")  # Crash before the crc of the last slot was written
+
+    ring = SnipeRingFile(path, slots=4, slot_size=512)
+    assert [s.content for s in ring.load(100)] == ["message 1"]
+    ring.close()
+
+
+def test_truncated_ring_file_is_reset(tmp_path):
+    directory = str(tmp_path)
+    store = SnipeFileStore(directory, groups=1)
+    store.append(100, record("kept?"))
+    store.close()
+    path = os.path.join(directory, "0.ring")
+    with open(path, "r+b") as f:
+        f.truncate(_RING_HEADER_SIZE + 10)
+
+    store = SnipeFileStore(directory, groups=1)
+    assert store.load(100) == []
+    assert os.path.exists(path + ".corrupt")
+    store.append(100, record("fresh"))
+    assert [s.content for s in store.load(100)] == ["fresh"]
+    store.close()
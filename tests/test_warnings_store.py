@@ -0,0 +1,289 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import warnings_store
+from warnings_store import (
+    BinarySnapshot, JournalWarningStore, SQLiteWarningStore, WarningShard,
+    migrate_to_binary, pack_record, pack_snapshot, read_journal
+)
+
+
+def reasons(store, guild_id, user_id):
+    return [warning["reason"] for warning in store.get_warnings(guild_id, user_id)]
+
+
+def test_torn_journal_tail_is_truncated_before_appending(tmp_path):
+    directory = str(tmp_path)
+    store = JournalWarningStore(directory)
+    store.add_warning(42, 1, "a", 9)
+    store.flush()
+    store.close()
+
+    journal_path = os.path.join(directory, "42.journal")
+    with open(journal_path, "a") as f:
+        f.write('{"seq": 2, "op": "wa')  # Crash mid-append
+
+    store = JournalWarningStore(directory)
+    store.add_warning(42, 1, "b", 9)
+    store.add_warning(42, 1, "c", 9)
+    store.flush()
+    store.close()
+
+    store = JournalWarningStore(directory)
+    assert reasons(store, 42, 1) == ["a", "b", "c"]
+    assert store.stats() == (3, 1)
+    store.close()
+    assert [record["seq"] for record in read_journal(journal_path)] == [1, 2, 3]
+
+
+def test_unterminated_last_record_counts_as_torn(tmp_path):
+    journal_path = str(tmp_path / "1.journal")
+    with open(journal_path, "w") as f:
+        f.write('{"seq": 1, "op": "clear", "user_id": 5}\n{"seq": 2, "op": "clear", "user_id": 6}')
+
+    assert [record["seq"] for record in read_journal(journal_path, repair=True)] == [1]
+    with open(journal_path) as f:
+        assert f.read() == '{"seq": 1, "op": "clear", "user_id": 5}\n'
+
+
+def write_legacy_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("warnings.json", "w") as f:
+        json.dump({"7": [{"reason": "old", "moderator_id": 9, "timestamp": "2024-01-01T00:00:00", "warning_id": 1}]}, f)
+
+
+def test_legacy_warnings_wait_for_their_guild(tmp_path, monkeypatch):
+    write_legacy_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(warnings_store, "LEGACY_GUILD_ID", None)
+
+    store = SQLiteWarningStore(str(tmp_path / "warnings.db"))
+    assert store.legacy_pending
+    assert store.stats() == (0, 0)  # Nothing filed under a made-up guild
+    assert os.path.exists("warnings.json")
+
+    store.add_warning(42, 7, "new", 9)
+    assert store.import_legacy(42) == 1
+    assert reasons(store, 42, 7) == ["old", "new"]
+    assert not store.legacy_pending and not os.path.exists("warnings.json")
+    store.close()
+
+
+def test_legacy_warnings_use_configured_guild(tmp_path, monkeypatch):
+    write_legacy_file(tmp_path, monkeypatch)
+    monkeypatch.setattr(warnings_store, "LEGACY_GUILD_ID", 42)
+
+    store = JournalWarningStore(str(tmp_path / "warnings"))
+    assert not store.legacy_pending
+    assert reasons(store, 42, 7) == ["old"]
+    assert store.stats() == (1, 1)
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal"])
+def test_backdated_legacy_import_keeps_ids_and_age_order(tmp_path, monkeypatch, backend):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(warnings_store, "LEGACY_GUILD_ID", None)
+    with open("warnings.json", "w") as f:
+        json.dump({"7": [
+            {"reason": f"old{i}", "moderator_id": 9, "timestamp": f"2020-01-0{i + 1}T00:00:00", "warning_id": i + 1}
+            for i in range(3)
+        ]}, f)
+    store = SQLiteWarningStore("warnings.db") if backend == "sqlite" else JournalWarningStore("warnings")
+
+    store.add_warning(42, 7, "new", 9)  # Warned while the legacy file was still waiting for its guild
+    store.import_legacy(42)
+    warnings = store.get_warnings(42, 7)
+    assert [w["reason"] for w in warnings] == ["old0", "old1", "old2", "new"]
+    assert sorted(w["warning_id"] for w in warnings) == [1, 2, 3, 4]
+    assert store.add_warning(42, 7, "newer", 9)["warning_id"] == 5
+
+    cutoff = datetime.utcnow() - timedelta(days=365)
+    assert store.prune_warnings(42, cutoff=cutoff)[0] == 3
+    assert reasons(store, 42, 7) == ["new", "newer"]
+    store.close()
+
+    if backend == "journal":  # Replaying the journal rebuilds the same order
+        store = JournalWarningStore("warnings")
+        assert reasons(store, 42, 7) == ["new", "newer"]
+        store.close()
+
+
+def warning(reason, moderator_id, warning_id, second=0):
+    return {
+        "reason": reason,
+        "moderator_id": moderator_id,
+        "timestamp": datetime(2024, 5, 1, 12, 0, second, 123456),
+        "warning_id": warning_id,
+    }
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "1.snap")
+    first = [warning("spam", 900, 1), warning("ünïcode ✅", 901, 2, 1)]
+    second = [warning("", 900, 1, 2)]
+    users = [
+        (10, 2, pack_record(first[0], 0) + pack_record(first[1], 1)),
+        (20, 1, pack_record(second[0], 0)),
+    ]
+    with open(path, "wb") as f:
+        f.write(pack_snapshot(7, [900, 901], users))
+
+    snapshot = BinarySnapshot(path)
+    assert snapshot.seq == 7
+    assert snapshot.decode(10) == first
+    assert snapshot.decode(10, 1, 2) == first[1:]
+    assert snapshot.decode(20) == second
+    assert snapshot.oldest_timestamp(10) == first[0]["timestamp"]
+    snapshot.close()
+
+
+@pytest.mark.parametrize("keep", [0, 10, 30, -1])
+def test_truncated_snapshot_is_rejected(tmp_path, keep):
+    path = str(tmp_path / "1.snap")
+    data = pack_snapshot(3, [900], [(10, 2, pack_record(warning("a", 900, 1), 0) * 2)])
+    with open(path, "wb") as f:
+        f.write(data[:keep])
+
+    with pytest.raises(ValueError):
+        BinarySnapshot(path)
+
+
+def test_recompaction_keeps_undecoded_and_changed_users(tmp_path):
+    directory = str(tmp_path)
+    store = JournalWarningStore(directory)
+    store.add_warning(1, 10, "first", 900)
+    store.add_warning(1, 20, "second", 901)
+    store.add_warning(1, 30, "cleared", 900)
+    store.checkpoint()
+    store.close()
+
+    # Reopen so users 10 and 20 stay undecoded in the mmap while the snapshot is rewritten
+    store = JournalWarningStore(directory)
+    store.add_warning(1, 20, "third", 902)
+    store.clear_warnings(1, 30, 900)
+    store.checkpoint()
+    store.close()
+    assert os.path.getsize(os.path.join(directory, "1.journal")) == 0
+
+    store = JournalWarningStore(directory)
+    assert [w["reason"] for w in store.get_warnings(1, 10)] == ["first"]
+    assert [(w["reason"], w["moderator_id"]) for w in store.get_warnings(1, 20)] == [("second", 901), ("third", 902)]
+    assert store.get_warnings(1, 30) == []
+    assert store.stats() == (3, 2)
+    store.close()
+
+
+def test_migrate_json_shard_to_binary(tmp_path):
+    directory = str(tmp_path)
+    store = JournalWarningStore(directory)
+    store.close()
+    shard = WarningShard(directory, 5)
+    with open(shard.json_snapshot_path, "w") as f:
+        f.write('{"seq": 1, "warnings": {"10": [{"reason": "old", "moderator_id": 900, '
+                '"timestamp": "2024-05-01T12:00:00.123456", "warning_id": 1}]}}')
+
+    assert migrate_to_binary(directory) == 1
+    assert not os.path.exists(shard.json_snapshot_path)
+    snapshot = BinarySnapshot(shard.snapshot_path)
+    assert snapshot.decode(10) == [warning("old", 900, 1)]
+    snapshot.close()
+
+
+def run_migrator(cwd, *args):
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "warnings_store.py")
+    env = {k: v for k, v in os.environ.items() if k != "WARNINGS_LEGACY_GUILD_ID"}
+    return subprocess.run([sys.executable, script, "migrate", *args], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def test_migrator_converts_legacy_file_end_to_end(tmp_path, monkeypatch):
+    write_legacy_file(tmp_path, monkeypatch)
+
+    result = run_migrator(tmp_path)
+    assert result.returncode != 0  # Refuses to guess the guild
+    assert os.path.exists("warnings.json")
+
+    result = run_migrator(tmp_path, "42")
+    assert result.returncode == 0, result.stderr
+    assert not os.path.exists("warnings.json") and os.path.exists("warnings.json.migrated")
+    assert os.path.getsize(os.path.join("warnings", "42.journal")) == 0
+    snapshot = BinarySnapshot(os.path.join("warnings", "42.snap"))
+    assert [(w["reason"], w["warning_id"]) for w in snapshot.decode(7)] == [("old", 1)]
+    snapshot.close()
+
+    store = JournalWarningStore("warnings")
+    assert store.stats() == (1, 1)
+    store.close()
+
+
+def open_store(backend, tmp_path):
+    if backend == "sqlite":
+        return SQLiteWarningStore(str(tmp_path / "warnings.db"), import_json=False)
+    return JournalWarningStore(str(tmp_path / "warnings"))
+
+
+def prune_all(store, guild_id, **rule):
+    removed, cursor = 0, None
+    while True:
+        batch_removed, cursor = store.prune_warnings(guild_id, cursor=cursor, batch=2, **rule)
+        removed += batch_removed
+        if cursor is None:
+            return removed
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal"])
+def test_prune_by_age(tmp_path, backend):
+    store = open_store(backend, tmp_path)
+    now = datetime.utcnow()
+    for user_id in (1, 2, 3):
+        store.add_warning(42, user_id, "stale", 9, now - timedelta(days=100))
+        store.add_warning(42, user_id, "recent", 9, now - timedelta(days=1))
+    store.add_warning(42, 4, "stale only", 9, now - timedelta(days=200))
+    store.add_warning(43, 1, "other guild", 9, now - timedelta(days=200))
+
+    assert prune_all(store, 42, cutoff=now - timedelta(days=30)) == 4
+    assert all(reasons(store, 42, user_id) == ["recent"] for user_id in (1, 2, 3))
+    assert reasons(store, 42, 4) == []
+    assert reasons(store, 43, 1) == ["other guild"]
+    assert store.guild_stats(42) == (3, 3)
+    store.close()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "journal"])
+def test_prune_by_count_keeps_newest(tmp_path, backend):
+    store = open_store(backend, tmp_path)
+    now = datetime.utcnow()
+    for user_id in (1, 2, 3):
+        for i in range(user_id + 1):
+            store.add_warning(42, user_id, f"w{i}", 9, now - timedelta(days=10 - i))
+
+    assert prune_all(store, 42, max_per_user=2) == 3
+    assert reasons(store, 42, 1) == ["w0", "w1"]
+    assert reasons(store, 42, 2) == ["w1", "w2"]
+    assert reasons(store, 42, 3) == ["w2", "w3"]
+    assert store.guild_stats(42) == (6, 3)
+    store.close()
+
+    if backend == "journal":  # The expiries survive a reload
+        store = open_store(backend, tmp_path)
+        assert reasons(store, 42, 3) == ["w2", "w3"]
+        assert store.guild_stats(42) == (6, 3)
+        store.close()
+
+
+def test_prune_loads_cold_shards_without_evicting_hot_ones(tmp_path):
+    directory = str(tmp_path)
+    store = JournalWarningStore(directory, max_shards=2)
+    for guild_id in (1, 2, 3):
+        store.add_warning(guild_id, 10, "a", 9)
+    store.flush()
+    assert list(store.shards) == [2, 3]
+
+    store.prune_warnings(1, max_per_user=5)
+    store.flush()
+    assert list(store.shards) == [2, 3]
+    store.close()
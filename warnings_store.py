@@ -0,0 +1,1228 @@
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import time
+import threading
+import heapq
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+WARNINGS_DIR = "warnings"  # One binary snapshot + journal per guild
+WARNINGS_FILE = "warnings.json"  # Single-file layout used before sharding
+JOURNAL_FILE = "warnings.journal"
+WARNINGS_DB = "warnings.db"
+COMPACT_EVERY = 500  # Journal records before a snapshot is worth writing
+MAX_LOADED_SHARDS = int(os.environ.get('WARNINGS_MAX_SHARDS', 64))
+
+# Warnings saved before storage was keyed by guild are filed under this guild.
+# Unset, the bot files them under its guild on first ready if it is in exactly one.
+LEGACY_GUILD_ID = int(os.environ['WARNINGS_LEGACY_GUILD_ID']) if os.environ.get('WARNINGS_LEGACY_GUILD_ID') else None
+
+RETENTION_FILE = os.environ.get('WARNINGS_RETENTION_FILE', "retention.json")
+
+
+def _fsync_dir(path):
+    """Flush a directory entry so renames survive a crash"""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path, content):
+    """Write a file via temp file + rename so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def encode_warning(warn):
+    """Convert an in-memory warning to its JSON form"""
+    return {
+        "reason": warn["reason"],
+        "moderator_id": warn["moderator_id"],
+        "timestamp": warn["timestamp"].isoformat(),
+        "warning_id": warn["warning_id"]
+    }
+
+
+def decode_warning(data):
+    """Convert a JSON warning back to its in-memory form"""
+    return {
+        "reason": data["reason"],
+        "moderator_id": data["moderator_id"],
+        "timestamp": datetime.fromisoformat(data["timestamp"]),
+        "warning_id": data["warning_id"]
+    }
+
+# ===== BINARY SNAPSHOT FORMAT =====
+# header     : magic, version, seq, moderator count, user count
+# moderators : interned moderator ids, referenced by index from records
+# user index : (user_id, offset of first record, record count) per user
+# records    : u32 length + (epoch microseconds, moderator index, warning_id, utf-8 reason)
+SNAPSHOT_MAGIC = b"WSNP"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sHQII")
+_MODERATOR = struct.Struct("<Q")
+_USER = struct.Struct("<QQI")
+_LENGTH = struct.Struct("<I")
+_RECORD = struct.Struct("<qII")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch_us(timestamp):
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch_us(value):
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def pack_record(warning, moderator_index):
+    """Encode one warning as a length-prefixed record"""
+    reason = warning["reason"].encode("utf-8")
+    body = _RECORD.pack(_to_epoch_us(warning["timestamp"]), moderator_index, warning["warning_id"]) + reason
+    return _LENGTH.pack(len(body)) + body
+
+
+def pack_snapshot(seq, moderators, users):
+    """Build a snapshot from interned moderator ids and [(user_id, count, record bytes)]"""
+    index_size = _HEADER.size + _MODERATOR.size * len(moderators) + _USER.size * len(users)
+    parts = [_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, seq, len(moderators), len(users))]
+    parts.extend(_MODERATOR.pack(moderator_id) for moderator_id in moderators)
+    offset = index_size
+    for user_id, count, records in users:
+        parts.append(_USER.pack(user_id, offset, count))
+        offset += len(records)
+    parts.extend(records for _, _, records in users)
+    return b"".join(parts)
+
+
+class BinarySnapshot:
+    """Memory-mapped snapshot; only the header and user index are read up front"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        magic, version, self.seq, moderator_count, user_count = _HEADER.unpack_from(self.buffer, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a warnings snapshot")
+        if len(self.buffer) < _HEADER.size + moderator_count * _MODERATOR.size + user_count * _USER.size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        pos = _HEADER.size
+        self.moderators = [
+            _MODERATOR.unpack_from(self.buffer, pos + i * _MODERATOR.size)[0]
+            for i in range(moderator_count)
+        ]
+        pos += moderator_count * _MODERATOR.size
+        self.users = {}  # user_id -> (offset, count)
+        for i in range(user_count):
+            user_id, offset, count = _USER.unpack_from(self.buffer, pos + i * _USER.size)
+            self.users[user_id] = (offset, count)
+        if not self._complete():
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+    def _complete(self):
+        """Whether the records of the last user end inside the file (snapshots are written whole)"""
+        if not self.users:
+            return True
+        offset, count = max(self.users.values())
+        try:
+            return self._span(offset, count) <= len(self.buffer)
+        except struct.error:
+            return False
+
+    def _span(self, offset, count):
+        """End offset of a user's records"""
+        end = offset
+        for _ in range(count):
+            end += _LENGTH.size + _LENGTH.unpack_from(self.buffer, end)[0]
+        return end
+
+    def oldest_timestamp(self, user_id):
+        """Timestamp of a user's first record, read without decoding the rest"""
+        offset, _ = self.users[user_id]
+        return _from_epoch_us(_RECORD.unpack_from(self.buffer, offset + _LENGTH.size)[0])
+
+    def raw_records(self, user_id):
+        offset, count = self.users[user_id]
+        return self.buffer[offset:self._span(offset, count)]
+
+    def decode(self, user_id, start=0, stop=None):
+        """Decode one user's warnings, or only records [start:stop] of them"""
+        offset, count = self.users[user_id]
+        stop = count if stop is None else min(stop, count)
+        warnings = []
+        pos = offset
+        for _ in range(min(start, count)):
+            pos += _LENGTH.size + _LENGTH.unpack_from(self.buffer, pos)[0]
+        for _ in range(max(0, stop - start)):
+            length = _LENGTH.unpack_from(self.buffer, pos)[0]
+            pos += _LENGTH.size
+            timestamp, moderator_index, warning_id = _RECORD.unpack_from(self.buffer, pos)
+            reason = self.buffer[pos + _RECORD.size:pos + length].decode("utf-8")
+            warnings.append({
+                "reason": reason,
+                "moderator_id": self.moderators[moderator_index],
+                "timestamp": _from_epoch_us(timestamp),
+                "warning_id": warning_id
+            })
+            pos += length
+        return warnings
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+
+def truncate_file(path, size):
+    """Cut a file back to size and make the cut durable"""
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal(path, after_seq=0, repair=False):
+    """Yield journal records newer than after_seq, stopping at a torn tail.
+
+    With repair the torn tail is truncated away once reached, so the next
+    append starts on a fresh line instead of being glued onto the fragment.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated record")
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-append; nothing after it is valid
+                logger.warning(f"⚠️  Ignoring torn record at end of {path}")
+                if repair:
+                    truncate_file(path, offset)
+                return
+            offset += len(line)
+            if record["seq"] > after_seq:
+                yield record
+
+
+class LegacyGuildUnknown(Exception):
+    """Raised when pre-guild warnings are found but nobody said which guild they belong to"""
+
+
+def legacy_warnings_pending():
+    """Whether a pre-sharding warnings.json or journal is still waiting to be imported"""
+    return os.path.exists(WARNINGS_FILE) or os.path.exists(JOURNAL_FILE)
+
+
+def read_single_file_warnings(snapshot_path=WARNINGS_FILE, journal_path=JOURNAL_FILE, legacy_guild_id=LEGACY_GUILD_ID):
+    """Read the pre-sharding warnings.json (+ journal) into {(guild_id, user_id): [...]}.
+
+    Both the original {user_id: [...]} layout and the guild-keyed one are
+    understood; warnings without a guild are filed under legacy_guild_id,
+    and LegacyGuildUnknown is raised if there are any and it is None.
+    """
+    def legacy_guild():
+        if legacy_guild_id is None:
+            raise LegacyGuildUnknown(f"{snapshot_path} has warnings without a guild")
+        return legacy_guild_id
+
+    warnings = defaultdict(list)
+    seq = 0
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r') as f:
+            data = json.load(f)
+        seq = data.get("seq", 0)
+        if isinstance(data.get("guilds"), dict):
+            guilds = data["guilds"]
+        elif isinstance(data.get("warnings"), dict):
+            guilds = {str(legacy_guild()): data["warnings"]} if data["warnings"] else {}
+        else:
+            guilds = {str(legacy_guild()): data} if data else {}
+        for guild_id_str, users in guilds.items():
+            for user_id_str, warnings_list in users.items():
+                key = (int(guild_id_str), int(user_id_str))
+                warnings[key] = [decode_warning(w) for w in warnings_list]
+
+    for record in read_journal(journal_path, seq):
+        key = (record["guild_id"] if "guild_id" in record else legacy_guild(), record["user_id"])
+        if record["op"] == "warn":
+            warnings[key].append(decode_warning(record))
+        elif record["op"] == "clear":
+            warnings.pop(key, None)
+    return warnings
+
+
+def shard_ids(directory=WARNINGS_DIR):
+    """Guild ids that have a snapshot or journal in the shard directory"""
+    guild_ids = set()
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext in (".snap", ".json", ".journal") and stem.isdigit():
+            guild_ids.add(int(stem))
+    return sorted(guild_ids)
+
+
+def load_json_warnings(directory=WARNINGS_DIR):
+    """Read every JSON warning on disk, sharded or single-file"""
+    if not os.path.isdir(directory):
+        return read_single_file_warnings()
+    warnings = {}
+    for guild_id in shard_ids(directory):
+        shard = WarningShard(directory, guild_id)
+        shard.load()
+        for user_id in list(shard.user_ids()):
+            warnings[(guild_id, user_id)] = shard.user_warnings(user_id)
+        shard.close()
+    return warnings
+
+
+def load_retention_rules(path=RETENTION_FILE):
+    """Read per-guild retention rules.
+
+    The file maps guild ids (or "default") to rules such as
+    {"max_age_days": 90, "max_per_user": 10}; either key may be omitted.
+    WARNINGS_MAX_AGE_DAYS / WARNINGS_MAX_PER_USER seed the default rule.
+    """
+    default = {}
+    if os.environ.get('WARNINGS_MAX_AGE_DAYS'):
+        default["max_age_days"] = int(os.environ['WARNINGS_MAX_AGE_DAYS'])
+    if os.environ.get('WARNINGS_MAX_PER_USER'):
+        default["max_per_user"] = int(os.environ['WARNINGS_MAX_PER_USER'])
+    rules = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for key, rule in json.load(f).items():
+                if key == "default":
+                    default.update(rule)
+                else:
+                    rules[int(key)] = rule
+    return default, rules
+
+
+class WarningCounters:
+    """Running totals kept in step with every warn and clear.
+
+    Reads are O(1); nothing here is ever recomputed by scanning warnings.
+    """
+
+    def __init__(self):
+        self.total_warnings = 0
+        self.total_users = 0
+        self.guilds = {}  # guild_id -> [warnings, users with warnings]
+        self.moderators = {}  # moderator_id -> warn + clear actions
+
+    def record_warn(self, guild_id, moderator_id, new_user):
+        counts = self.guilds.setdefault(guild_id, [0, 0])
+        counts[0] += 1
+        self.total_warnings += 1
+        if new_user:
+            counts[1] += 1
+            self.total_users += 1
+        self.record_action(moderator_id)
+
+    def record_clear(self, guild_id, moderator_id, removed):
+        counts = self.guilds.setdefault(guild_id, [0, 0])
+        counts[0] -= removed
+        counts[1] -= 1
+        self.total_warnings -= removed
+        self.total_users -= 1
+        self.record_action(moderator_id)
+
+    def record_expired(self, guild_id, removed, emptied_users):
+        counts = self.guilds.setdefault(guild_id, [0, 0])
+        counts[0] -= removed
+        counts[1] -= emptied_users
+        self.total_warnings -= removed
+        self.total_users -= emptied_users
+
+    def record_action(self, moderator_id):
+        if moderator_id is not None:
+            self.moderators[moderator_id] = self.moderators.get(moderator_id, 0) + 1
+
+    def set_guild(self, guild_id, warnings, users):
+        """Replace a guild's counts, e.g. after recounting a loaded shard"""
+        old_warnings, old_users = self.guilds.get(guild_id, (0, 0))
+        self.guilds[guild_id] = [warnings, users]
+        self.total_warnings += warnings - old_warnings
+        self.total_users += users - old_users
+
+    def guild(self, guild_id):
+        return tuple(self.guilds.get(guild_id, (0, 0)))
+
+    def moderator(self, moderator_id):
+        return self.moderators.get(moderator_id, 0)
+
+
+class WarningStore:
+    """Interface shared by the warnings storage backends.
+
+    Mutations only touch memory (or an open transaction) and set ``dirty``;
+    ``flush()`` makes them durable and is meant to run on a writer thread.
+    ``lock`` guards every mutation so a flush or snapshot never observes a
+    half-applied change.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.dirty = threading.Event()
+        self.changes_since_checkpoint = 0
+        self.counters = WarningCounters()
+        self.legacy_pending = False  # Pre-sharding warnings waiting for their guild
+
+    def _mark_dirty(self, changes=1):
+        self.changes_since_checkpoint += changes
+        self.dirty.set()
+
+    def _import_legacy_if_known(self):
+        """Import pre-sharding warnings now, unless their guild has to wait for the bot to connect"""
+        self.legacy_pending = legacy_warnings_pending()
+        if not self.legacy_pending:
+            return
+        try:
+            self.import_legacy(LEGACY_GUILD_ID)
+        except LegacyGuildUnknown:
+            logger.warning(
+                f"⚠️  {WARNINGS_FILE} has warnings without a guild; they will be imported once the bot "
+                f"is ready if it is in a single guild, or set WARNINGS_LEGACY_GUILD_ID"
+            )
+
+    def import_legacy(self, legacy_guild_id):
+        """Merge the pre-sharding warnings.json (+ journal) into this store, then retire the files.
+
+        Guildless warnings go to legacy_guild_id; they are added like new
+        warnings, so counters and existing warnings stay consistent. The
+        backends slot them in by timestamp and give them fresh ids.
+        """
+        warnings = read_single_file_warnings(legacy_guild_id=legacy_guild_id)
+        imported = 0
+        with self.lock:
+            for (guild_id, user_id), warnings_list in warnings.items():
+                for warning in warnings_list:
+                    self.add_warning(guild_id, user_id, warning["reason"], warning["moderator_id"], warning["timestamp"])
+                    imported += 1
+        self.flush()
+        for path in (WARNINGS_FILE, JOURNAL_FILE):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.migrated")
+        self.legacy_pending = False
+        logger.info(f"✅ Imported {imported} warning(s) from {WARNINGS_FILE}")
+        return imported
+
+    def add_warning(self, guild_id, user_id, reason, moderator_id, timestamp=None):
+        """Store a warning and return it"""
+        raise NotImplementedError
+
+    def add_warnings(self, guild_id, user_ids, reason, moderator_id):
+        """Warn several users as one batch; returns {user_id: warning}.
+
+        The whole batch is applied under one lock hold, so the writer
+        picks it up as a single persistence write.
+        """
+        timestamp = datetime.utcnow()
+        with self.lock:
+            return {
+                user_id: self.add_warning(guild_id, user_id, reason, moderator_id, timestamp)
+                for user_id in user_ids
+            }
+
+    def get_warnings(self, guild_id, user_id):
+        """Return a member's warnings, oldest first"""
+        raise NotImplementedError
+
+    def get_warnings_page(self, guild_id, user_id, offset, limit):
+        """Return warnings [offset:offset + limit] of a member, oldest first"""
+        return self.get_warnings(guild_id, user_id)[offset:offset + limit]
+
+    def count_warnings(self, guild_id, user_id):
+        raise NotImplementedError
+
+    def clear_warnings(self, guild_id, user_id, moderator_id=None):
+        """Delete a member's warnings and return how many were removed"""
+        raise NotImplementedError
+
+    def prune_warnings(self, guild_id, cutoff=None, max_per_user=None, cursor=None, batch=100):
+        """Expire warnings older than cutoff or beyond max_per_user (oldest first).
+
+        Does at most one small batch of work. Returns (removed, cursor);
+        call again with the cursor until it comes back as None. May read
+        from disk, so async callers run it in a thread (it takes the lock).
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """Return (total warnings, users with warnings)"""
+        return self.counters.total_warnings, self.counters.total_users
+
+    def guild_stats(self, guild_id):
+        """Return (warnings, users with warnings) for one guild"""
+        return self.counters.guild(guild_id)
+
+    def moderator_actions(self, moderator_id):
+        """Warns and clears performed by a moderator"""
+        return self.counters.moderator(moderator_id)
+
+    def flush(self):
+        """Durably write pending changes (blocking)"""
+        raise NotImplementedError
+
+    def needs_checkpoint(self):
+        return False
+
+    def checkpoint(self):
+        """Heavier housekeeping such as compaction (blocking)"""
+        self.changes_since_checkpoint = 0
+
+    def close(self):
+        pass
+
+
+class WarningShard:
+    """One guild's warnings: a binary snapshot plus an append-only journal.
+
+    Users in the snapshot stay undecoded in the mmap until first read.
+    Each journal line carries a sequence number and the snapshot records
+    the last sequence it contains, so replaying after a crash
+    mid-compaction never applies an action twice.
+    """
+
+    def __init__(self, directory, guild_id):
+        self.guild_id = guild_id
+        self.snapshot_path = os.path.join(directory, f"{guild_id}.snap")
+        self.json_snapshot_path = os.path.join(directory, f"{guild_id}.json")  # Pre-binary layout
+        self.journal_path = os.path.join(directory, f"{guild_id}.journal")
+        self.seq = 0
+        self.warnings = {}  # Decoded users
+        self.changes_since_checkpoint = 0
+        self._snapshot = None
+        self._undecoded = {}  # user_id -> record count, for users still in the mmap
+        self._buffer = []  # Journal lines not yet written
+        self._journal = None
+
+    def load(self):
+        """Map the snapshot and replay the journal on top of it"""
+        if os.path.exists(self.snapshot_path):
+            self._snapshot = BinarySnapshot(self.snapshot_path)
+            self.seq = self._snapshot.seq
+            self._undecoded = {user_id: count for user_id, (_, count) in self._snapshot.users.items()}
+        elif os.path.exists(self.json_snapshot_path):
+            with open(self.json_snapshot_path, 'r') as f:
+                data = json.load(f)
+            self.seq = data["seq"]
+            self.warnings = {
+                int(user_id_str): [decode_warning(w) for w in warnings_list]
+                for user_id_str, warnings_list in data["warnings"].items()
+            }
+            self.changes_since_checkpoint = 1  # Rewrite it as a binary snapshot
+        for record in read_journal(self.journal_path, self.seq, repair=True):
+            self.apply(record)
+            self.seq = record["seq"]
+            self.changes_since_checkpoint += 1
+
+    def apply(self, record):
+        user_id = record["user_id"]
+        if record["op"] == "warn":
+            self.insert(user_id, decode_warning(record))
+        elif record["op"] == "clear":
+            self.pop_user(user_id)
+        elif record["op"] == "expire":
+            self.expire_oldest(user_id, record["count"])
+
+    def oldest_timestamp(self, user_id):
+        if user_id in self._undecoded:
+            return self._snapshot.oldest_timestamp(user_id)
+        warnings = self.warnings.get(user_id)
+        return warnings[0]["timestamp"] if warnings else None
+
+    def insert(self, user_id, warning):
+        """Add a warning in timestamp order (imported ones can predate the newest); returns the user's list"""
+        warnings = self.user_warnings(user_id, create=True)
+        pos = len(warnings)
+        while pos and warnings[pos - 1]["timestamp"] > warning["timestamp"]:
+            pos -= 1
+        warnings.insert(pos, warning)
+        return warnings
+
+    def expire_oldest(self, user_id, count):
+        """Drop a user's oldest warnings; returns True if none are left"""
+        warnings = self.user_warnings(user_id)
+        if not warnings:
+            return False
+        del warnings[:count]
+        if not warnings:
+            del self.warnings[user_id]
+            return True
+        return False
+
+    def user_ids(self):
+        yield from self.warnings
+        yield from self._undecoded
+
+    def user_warnings(self, user_id, create=False):
+        """A user's warning list, decoding it from the snapshot on first use"""
+        warnings = self.warnings.get(user_id)
+        if warnings is None:
+            if user_id in self._undecoded:
+                del self._undecoded[user_id]
+                warnings = self.warnings[user_id] = self._snapshot.decode(user_id)
+            elif create:
+                warnings = self.warnings[user_id] = []
+        return warnings
+
+    def user_warnings_page(self, user_id, offset, limit):
+        """A slice of a user's warnings; undecoded users are read from the snapshot without decoding the rest"""
+        if user_id in self._undecoded:
+            return self._snapshot.decode(user_id, offset, offset + limit)
+        return self.warnings.get(user_id, [])[offset:offset + limit]
+
+    def user_count(self, user_id):
+        if user_id in self._undecoded:
+            return self._undecoded[user_id]
+        return len(self.warnings.get(user_id, ()))
+
+    def pop_user(self, user_id):
+        """Remove a user and return how many warnings they had"""
+        if user_id in self._undecoded:
+            return self._undecoded.pop(user_id)
+        return len(self.warnings.pop(user_id, ()))
+
+    def counts(self):
+        decoded = sum(len(w) for w in self.warnings.values())
+        return decoded + sum(self._undecoded.values()), len(self.warnings) + len(self._undecoded)
+
+    def append(self, op, user_id, warning=None, **fields):
+        """Queue one action for the journal"""
+        self.seq += 1
+        record = {"seq": self.seq, "op": op, "user_id": user_id, **fields}
+        if warning is not None:
+            record.update(encode_warning(warning))
+        self._buffer.append(json.dumps(record) + "\n")
+        self.changes_since_checkpoint += 1
+
+    def has_pending(self):
+        return bool(self._buffer)
+
+    def take_pending(self):
+        lines, self._buffer = self._buffer, []
+        return lines
+
+    def write_journal(self, lines):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def snapshot(self):
+        """Encode the current state as snapshot bytes.
+
+        Users never decoded are copied as raw records; keeping the old
+        moderator table as a prefix keeps their indexes valid.
+        """
+        moderators = list(self._snapshot.moderators) if self._snapshot else []
+        moderator_index = {moderator_id: i for i, moderator_id in enumerate(moderators)}
+        users = []
+        for user_id, count in self._undecoded.items():
+            users.append((user_id, count, self._snapshot.raw_records(user_id)))
+        for user_id, warnings_list in self.warnings.items():
+            if not warnings_list:
+                continue
+            records = []
+            for warning in warnings_list:
+                index = moderator_index.get(warning["moderator_id"])
+                if index is None:
+                    index = moderator_index[warning["moderator_id"]] = len(moderators)
+                    moderators.append(warning["moderator_id"])
+                records.append(pack_record(warning, index))
+            users.append((user_id, len(warnings_list), b"".join(records)))
+        return self.seq, pack_snapshot(self.seq, moderators, users)
+
+    def write_snapshot(self, snapshot):
+        """Write a snapshot atomically, then drop the journal records it covers"""
+        seq, data = snapshot
+        _atomic_write(self.snapshot_path, data)
+        if os.path.exists(self.json_snapshot_path):
+            os.remove(self.json_snapshot_path)
+        self.close_journal()
+        remaining = [json.dumps(record) + "\n" for record in read_journal(self.journal_path, seq)]
+        _atomic_write(self.journal_path, "".join(remaining))
+
+    def close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def close(self):
+        self.close_journal()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+            self._undecoded = {}
+
+
+class JournalWarningStore(WarningStore):
+    """Warnings sharded per guild, each shard a binary snapshot plus journal.
+
+    Shards load on first access and idle ones are evicted once more than
+    ``max_shards`` are in memory. Guild and moderator counters live in a
+    small index file so totals never require loading every shard.
+    """
+
+    def __init__(self, directory=WARNINGS_DIR, compact_every=COMPACT_EVERY, max_shards=MAX_LOADED_SHARDS):
+        super().__init__()
+        self.directory = directory
+        self.compact_every = compact_every
+        self.max_shards = max_shards
+        self.shards = OrderedDict()  # guild_id -> WarningShard, least recently used first
+        self.index_path = os.path.join(directory, "index.json")
+        self._io_lock = threading.Lock()  # Serializes journal, snapshot and index writes
+        self._index_dirty = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        self._import_legacy_if_known()
+
+    # ----- Shards -----
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if "guilds" not in index:
+                index = {"guilds": index, "moderators": {}}  # Index written before moderator counts
+            for guild_id, (warnings, users) in index["guilds"].items():
+                self.counters.set_guild(int(guild_id), warnings, users)
+            self.counters.moderators = {int(m): actions for m, actions in index["moderators"].items()}
+            return
+        # No index yet (first run or lost): count each shard once, one at a time
+        for guild_id in shard_ids(self.directory):
+            shard = WarningShard(self.directory, guild_id)
+            shard.load()
+            self.counters.set_guild(guild_id, *shard.counts())
+            shard.close()
+            self._index_dirty = True
+
+    def _shard(self, guild_id, touch=True):
+        """Return a guild's shard, loading it on first access; caller holds the lock.
+
+        With touch=False (background sweeps) the access doesn't count as use:
+        a shard loaded for it goes to the cold end so it is evicted first.
+        """
+        shard = self.shards.get(guild_id)
+        if shard is not None:
+            if touch:
+                self.shards.move_to_end(guild_id)
+            return shard
+        shard = WarningShard(self.directory, guild_id)
+        shard.load()
+        self.shards[guild_id] = shard
+        if not touch:
+            self.shards.move_to_end(guild_id, last=False)
+        counts = shard.counts()
+        if self.counters.guild(guild_id) != counts:
+            self.counters.set_guild(guild_id, *counts)  # The index was stale (e.g. after a crash)
+            self._index_dirty = True
+        if len(self.shards) > self.max_shards:
+            self.dirty.set()  # The writer evicts once pending journal lines are out
+        return shard
+
+    def _evict_idle(self):
+        """Drop least recently used shards over budget; caller holds both locks"""
+        excess = len(self.shards) - self.max_shards
+        for guild_id in list(self.shards):
+            if excess <= 0:
+                break
+            shard = self.shards[guild_id]
+            if shard.has_pending():
+                continue
+            shard.close()
+            del self.shards[guild_id]
+            excess -= 1
+
+    # ----- WarningStore -----
+    def add_warning(self, guild_id, user_id, reason, moderator_id, timestamp=None):
+        with self.lock:
+            shard = self._shard(guild_id)
+            user_warnings = shard.user_warnings(user_id) or ()
+            warning = {
+                "reason": reason,
+                "moderator_id": moderator_id,
+                "timestamp": timestamp or datetime.utcnow(),
+                "warning_id": max((w["warning_id"] for w in user_warnings), default=0) + 1
+            }
+            user_warnings = shard.insert(user_id, warning)
+            shard.append("warn", user_id, warning)
+            self.counters.record_warn(guild_id, moderator_id, new_user=len(user_warnings) == 1)
+            self._index_dirty = True
+            self._mark_dirty()
+        return warning
+
+    def get_warnings(self, guild_id, user_id):
+        with self.lock:
+            return list(self._shard(guild_id).user_warnings(user_id) or ())
+
+    def get_warnings_page(self, guild_id, user_id, offset, limit):
+        with self.lock:
+            return self._shard(guild_id).user_warnings_page(user_id, offset, limit)
+
+    def count_warnings(self, guild_id, user_id):
+        with self.lock:
+            return self._shard(guild_id).user_count(user_id)
+
+    def clear_warnings(self, guild_id, user_id, moderator_id=None):
+        with self.lock:
+            shard = self._shard(guild_id)
+            removed = shard.pop_user(user_id)
+            if not removed:
+                return 0
+            shard.append("clear", user_id)
+            self.counters.record_clear(guild_id, moderator_id, removed)
+            self._index_dirty = True
+            self._mark_dirty()
+        return removed
+
+    def prune_warnings(self, guild_id, cutoff=None, max_per_user=None, cursor=None, batch=100):
+        with self.lock:
+            shard = self._shard(guild_id, touch=False)
+            # The next batch of users, in id order after the cursor
+            candidates = (u for u in shard.user_ids() if cursor is None or u > cursor)
+            user_ids = heapq.nsmallest(batch, candidates)
+            removed = emptied = 0
+            for user_id in user_ids:
+                count = shard.user_count(user_id)
+                expire = count - max_per_user if max_per_user is not None and count > max_per_user else 0
+                if cutoff is not None and shard.oldest_timestamp(user_id) < cutoff:
+                    warnings = shard.user_warnings(user_id)
+                    expired_by_age = next((i for i, w in enumerate(warnings) if w["timestamp"] >= cutoff), len(warnings))
+                    expire = max(expire, expired_by_age)
+                if expire <= 0:
+                    continue
+                if shard.expire_oldest(user_id, expire):
+                    emptied += 1
+                shard.append("expire", user_id, count=expire)
+                removed += expire
+            if removed:
+                self.counters.record_expired(guild_id, removed, emptied)
+                self._index_dirty = True
+                self._mark_dirty(removed)
+        next_cursor = user_ids[-1] if len(user_ids) == batch else None
+        return removed, next_cursor
+
+    def flush(self):
+        with self._io_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        with self.lock:
+            pending = [(shard, shard.take_pending()) for shard in self.shards.values() if shard.has_pending()]
+            index = None
+            if self._index_dirty:
+                index = {
+                    "guilds": {str(g): counts[:] for g, counts in self.counters.guilds.items() if counts[0]},
+                    "moderators": {str(m): actions for m, actions in self.counters.moderators.items()}
+                }
+                self._index_dirty = False
+        for shard, lines in pending:
+            shard.write_journal(lines)
+        if index is not None:
+            _atomic_write(self.index_path, json.dumps(index))
+        with self.lock:
+            self._evict_idle()
+
+    def needs_checkpoint(self):
+        with self.lock:
+            return any(shard.changes_since_checkpoint >= self.compact_every for shard in self.shards.values())
+
+    def checkpoint(self):
+        """Compact every loaded shard that changed since its last snapshot"""
+        with self._io_lock:
+            # Everything up to a snapshot's seq must be on disk before its journal is trimmed
+            self._flush_locked()
+            with self.lock:
+                snapshots = []
+                for shard in self.shards.values():
+                    if shard.changes_since_checkpoint:
+                        snapshots.append((shard, shard.snapshot()))
+                        shard.changes_since_checkpoint = 0
+                self.changes_since_checkpoint = 0
+            for shard, snapshot in snapshots:
+                shard.write_snapshot(snapshot)
+
+        if snapshots:
+            logger.info(f"✅ Compacted warnings snapshots for {len(snapshots)} guild(s)")
+
+    def close(self):
+        with self._io_lock:
+            self._flush_locked()
+            for shard in self.shards.values():
+                shard.close()
+
+
+class SQLiteWarningStore(WarningStore):
+    """Warnings kept in SQLite (WAL mode) and queried through an index.
+
+    Nothing is held in memory; reads, counts and deletes are indexed
+    lookups on (guild_id, user_id, timestamp). Writes stay in an open
+    transaction until ``flush()`` commits them.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            warning_id INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            moderator_id INTEGER NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_warnings_member
+            ON warnings (guild_id, user_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_warnings_age
+            ON warnings (guild_id, timestamp);
+
+        CREATE TABLE IF NOT EXISTS warning_counts (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS moderator_actions (
+            moderator_id INTEGER PRIMARY KEY,
+            actions INTEGER NOT NULL
+        );
+
+        -- Keep per-user counts in step with every insert and delete
+        CREATE TRIGGER IF NOT EXISTS warnings_counted AFTER INSERT ON warnings BEGIN
+            INSERT INTO warning_counts (guild_id, user_id, count) VALUES (NEW.guild_id, NEW.user_id, 1)
+                ON CONFLICT (guild_id, user_id) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS warnings_uncounted AFTER DELETE ON warnings BEGIN
+            UPDATE warning_counts SET count = count - 1
+                WHERE guild_id = OLD.guild_id AND user_id = OLD.user_id;
+            DELETE FROM warning_counts
+                WHERE guild_id = OLD.guild_id AND user_id = OLD.user_id AND count <= 0;
+        END;
+    """
+
+    def __init__(self, path=WARNINGS_DB, import_json=True):
+        super().__init__()
+        self.path = path
+        # Shared with the writer thread; every use goes through self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        if import_json:
+            self._import_json()
+        self._load_counters()
+        if import_json:
+            self._import_legacy_if_known()
+
+    def _load_counters(self):
+        """Seed the in-memory counters from the count tables"""
+        with self.conn:
+            # Databases created before the count tables existed need one backfill
+            if not self.conn.execute("SELECT 1 FROM warning_counts LIMIT 1").fetchone():
+                self.conn.execute(
+                    "INSERT INTO warning_counts (guild_id, user_id, count) "
+                    "SELECT guild_id, user_id, COUNT(*) FROM warnings GROUP BY guild_id, user_id"
+                )
+        rows = self.conn.execute(
+            "SELECT guild_id, SUM(count), COUNT(*) FROM warning_counts GROUP BY guild_id"
+        )
+        for guild_id, warnings, users in rows:
+            self.counters.set_guild(guild_id, warnings, users)
+        self.counters.moderators = dict(self.conn.execute("SELECT moderator_id, actions FROM moderator_actions"))
+
+    def _record_action(self, moderator_id):
+        if moderator_id is None:
+            return
+        self.conn.execute(
+            "INSERT INTO moderator_actions (moderator_id, actions) VALUES (?, 1) "
+            "ON CONFLICT (moderator_id) DO UPDATE SET actions = actions + 1",
+            (moderator_id,)
+        )
+
+    def _import_json(self):
+        """One-time import of the JSON warning shards into an empty database"""
+        if not os.path.isdir(WARNINGS_DIR) or self.conn.execute("SELECT 1 FROM warnings LIMIT 1").fetchone():
+            return
+        warnings = load_json_warnings()
+        if not warnings:
+            return
+        rows = [
+            (guild_id, user_id, w["warning_id"], w["reason"], w["moderator_id"], w["timestamp"].isoformat())
+            for (guild_id, user_id), warnings_list in warnings.items()
+            for w in warnings_list
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO warnings (guild_id, user_id, warning_id, reason, moderator_id, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        logger.info(f"✅ Imported {len(rows)} JSON warnings into {self.path}")
+
+    @staticmethod
+    def _row_to_warning(row):
+        warning_id, reason, moderator_id, timestamp = row
+        return {
+            "reason": reason,
+            "moderator_id": moderator_id,
+            "timestamp": datetime.fromisoformat(timestamp),
+            "warning_id": warning_id
+        }
+
+    def add_warning(self, guild_id, user_id, reason, moderator_id, timestamp=None):
+        with self.lock:
+            count = self.count_warnings(guild_id, user_id)
+            # Imported warnings can be backdated, so the newest row doesn't hold the highest id
+            last_id = self.conn.execute(
+                "SELECT MAX(warning_id) FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            ).fetchone()[0]
+            warning = {
+                "reason": reason,
+                "moderator_id": moderator_id,
+                "timestamp": timestamp or datetime.utcnow(),
+                "warning_id": (last_id or 0) + 1
+            }
+            self.conn.execute(
+                "INSERT INTO warnings (guild_id, user_id, warning_id, reason, moderator_id, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (guild_id, user_id, warning["warning_id"], reason, moderator_id, warning["timestamp"].isoformat())
+            )
+            self._record_action(moderator_id)
+            self.counters.record_warn(guild_id, moderator_id, new_user=count == 0)
+            self._mark_dirty()
+        return warning
+
+    def get_warnings(self, guild_id, user_id):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT warning_id, reason, moderator_id, timestamp FROM warnings "
+                "WHERE guild_id = ? AND user_id = ? ORDER BY timestamp, id",
+                (guild_id, user_id)
+            ).fetchall()
+        return [self._row_to_warning(row) for row in rows]
+
+    def get_warnings_page(self, guild_id, user_id, offset, limit):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT warning_id, reason, moderator_id, timestamp FROM warnings "
+                "WHERE guild_id = ? AND user_id = ? ORDER BY timestamp, id LIMIT ? OFFSET ?",
+                (guild_id, user_id, limit, offset)
+            ).fetchall()
+        return [self._row_to_warning(row) for row in rows]
+
+    def count_warnings(self, guild_id, user_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT count FROM warning_counts WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def clear_warnings(self, guild_id, user_id, moderator_id=None):
+        with self.lock:
+            removed = self.conn.execute(
+                "DELETE FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            ).rowcount
+            if removed:
+                self._record_action(moderator_id)
+                self.counters.record_clear(guild_id, moderator_id, removed)
+                self._mark_dirty()
+        return removed
+
+    def prune_warnings(self, guild_id, cutoff=None, max_per_user=None, cursor=None, batch=100):
+        with self.lock:
+            doomed = []
+            if cutoff is not None:
+                doomed = self.conn.execute(
+                    "SELECT id, user_id FROM warnings WHERE guild_id = ? AND timestamp < ? LIMIT ?",
+                    (guild_id, cutoff.isoformat(), batch)
+                ).fetchall()
+            if not doomed and max_per_user is not None:
+                over_limit = self.conn.execute(
+                    "SELECT user_id, count FROM warning_counts WHERE guild_id = ? AND count > ? LIMIT ?",
+                    (guild_id, max_per_user, batch)
+                ).fetchall()
+                for user_id, count in over_limit:
+                    doomed.extend(self.conn.execute(
+                        "SELECT id, user_id FROM warnings WHERE guild_id = ? AND user_id = ? "
+                        "ORDER BY timestamp, id LIMIT ?",
+                        (guild_id, user_id, count - max_per_user)
+                    ))
+            if not doomed:
+                return 0, None
+
+            self.conn.executemany("DELETE FROM warnings WHERE id = ?", [(row_id,) for row_id, _ in doomed])
+            user_ids = {user_id for _, user_id in doomed}
+            remaining = self.conn.execute(
+                f"SELECT COUNT(*) FROM warning_counts WHERE guild_id = ? "
+                f"AND user_id IN ({','.join('?' * len(user_ids))})",
+                (guild_id, *user_ids)
+            ).fetchone()[0]
+            self.counters.record_expired(guild_id, len(doomed), len(user_ids) - remaining)
+            self._mark_dirty(len(doomed))
+        # Deleted rows are gone from the index, so the next batch simply starts over
+        return len(doomed), True
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+
+    def checkpoint(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            self.changes_since_checkpoint = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class PersistenceWriter:
+    """Background thread that persists a store's changes.
+
+    Waits for the store's dirty flag, then sleeps for ``debounce`` seconds
+    so a burst of warns is committed as one write.
+    """
+
+    def __init__(self, store, debounce=2.0):
+        self.store = store
+        self.debounce = debounce
+        self.writes = 0
+        self.failed_writes = 0
+        self.write_seconds = 0.0  # Total time spent in flush and checkpoint
+        self.last_write_seconds = 0.0
+        self._checkpoint_requested = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="warnings-writer", daemon=True)
+        self._thread.start()
+        logger.info("✅ Warnings writer started")
+
+    def request_checkpoint(self):
+        self._checkpoint_requested.set()
+        self.store.dirty.set()  # Wake the writer
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.store.dirty.wait()
+            if self._stopping.wait(self.debounce):
+                break
+            self._write_once()
+
+    def _write_once(self):
+        # Clear before writing so changes made during the write trigger another pass
+        self.store.dirty.clear()
+        started = time.perf_counter()
+        try:
+            self.store.flush()
+            if self._checkpoint_requested.is_set() or self.store.needs_checkpoint():
+                self._checkpoint_requested.clear()
+                self.store.checkpoint()
+            self.writes += 1
+        except Exception as e:
+            self.failed_writes += 1
+            logger.error(f"❌ Error saving warnings: {e}")
+        self.last_write_seconds = time.perf_counter() - started
+        self.write_seconds += self.last_write_seconds
+
+    def stop(self):
+        """Stop the thread and write anything still pending"""
+        self._stopping.set()
+        self.store.dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        if self.store.changes_since_checkpoint:
+            self._checkpoint_requested.set()
+        self._write_once()
+
+
+WARNING_BACKENDS = {
+    "sqlite": SQLiteWarningStore,
+    "journal": JournalWarningStore,
+}
+
+
+def open_warning_store(backend="sqlite"):
+    """Create the warnings store for a backend name"""
+    try:
+        store_cls = WARNING_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown warnings backend: {backend!r}") from None
+    return store_cls()
+
+
+def migrate_to_binary(directory=WARNINGS_DIR, legacy_guild_id=LEGACY_GUILD_ID):
+    """One-way migration of JSON warnings to binary snapshots.
+
+    A single-file warnings.json is imported into shards first (guildless
+    warnings under legacy_guild_id; LegacyGuildUnknown if that is None).
+    Every shard with a JSON snapshot or journal records is then rewritten
+    as a .snap file. Returns how many snapshots were written.
+    """
+    store = JournalWarningStore(directory)
+    try:
+        if store.legacy_pending:
+            store.import_legacy(legacy_guild_id)
+    finally:
+        store.close()
+    converted = 0
+    for guild_id in shard_ids(directory):
+        shard = WarningShard(directory, guild_id)
+        pending_journal = os.path.exists(shard.journal_path) and os.path.getsize(shard.journal_path) > 0
+        if os.path.exists(shard.json_snapshot_path) or pending_journal:
+            shard.load()
+            shard.write_snapshot(shard.snapshot())
+            converted += 1
+        shard.close()
+    return converted
+
+
+if __name__ == "__main__":
+    if not 2 <= len(sys.argv) <= 3 or sys.argv[1] != "migrate" or not all(a.isdigit() for a in sys.argv[2:]):
+        print("Usage: python warnings_store.py migrate [legacy_guild_id]")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    guild_id = int(sys.argv[2]) if len(sys.argv) == 3 else LEGACY_GUILD_ID
+    try:
+        converted = migrate_to_binary(legacy_guild_id=guild_id)
+    except LegacyGuildUnknown:
+        print(f"❌ {WARNINGS_FILE} has warnings without a guild; pass the guild id: "
+              f"python warnings_store.py migrate <guild_id>")
+        sys.exit(1)
+    print(f"✅ Wrote {converted} binary warnings snapshot(s)")